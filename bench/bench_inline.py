@@ -0,0 +1,50 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from textnode import TextNode, TextType
+from main import (
+    split_nodes_image,
+    split_nodes_link,
+    split_nodes_delimiter,
+    text_to_textnodes
+)
+
+
+SENTENCE = (
+    "This is **bold** text with an _italic_ word, some `inline code`, "
+    "a [link](https://boot.dev) and an ![image](/images/tom.png). "
+)
+PROSE_SENTENCE = "The elves of Rivendell sang beneath the stars while Glorfindel rode toward the ford. "
+
+
+def chained_text_to_textnodes(text: str) -> list[TextNode]:
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+
+def main():
+    for sentence, sentences in [(SENTENCE, count) for count in (10, 100, 1000)] + [(PROSE_SENTENCE, 10)]:
+        text = sentence * sentences
+        number = max(1, 2000 // sentences)
+
+        chained = timeit.timeit(lambda: chained_text_to_textnodes(text), number=number) / number
+        single = timeit.timeit(lambda: text_to_textnodes(text), number=number) / number
+
+        print(
+            f"{len(text):>8} chars: "
+            f"chained {chained * 1000:8.3f} ms, "
+            f"single pass {single * 1000:8.3f} ms, "
+            f"speedup {chained / single:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
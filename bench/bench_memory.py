@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import resource
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_corpus
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from textnode import TextNode, TextType
+from main import markdown_to_html_node
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+
+def instance_size(node: object) -> int:
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def count_nodes(node: HTMLNode) -> int:
+    if not isinstance(node.children, list):
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="bench/bench_memory.py")
+    parser.add_argument("--pages", type=int, default=100000, help="size of the corpus to parse")
+    parser.add_argument("--retain", type=int, default=10000, help="number of parsed pages kept alive at once")
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    corpus_dir = os.path.join(CORPUS_DIR, f"seed{args.seed}-{args.pages}")
+    paths = generate_corpus(corpus_dir, args.pages, args.seed)
+
+    start_rss = peak_rss_mb()
+    retained: list[HTMLNode] = []
+    nodes = 0
+
+    for path in paths:
+        with open(path) as file:
+            tree = markdown_to_html_node(file.read())
+
+        nodes += count_nodes(tree)
+        retained.append(tree)
+
+        if len(retained) >= args.retain:
+            retained = []
+
+    print(json.dumps({
+        "pages": args.pages,
+        "retained_pages": args.retain,
+        "html_nodes": nodes,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_growth_mb": peak_rss_mb() - start_rss,
+        "instance_bytes": {
+            "TextNode": instance_size(TextNode("text", TextType.TEXT)),
+            "LeafNode": instance_size(LeafNode(None, "text")),
+            "ParentNode": instance_size(ParentNode("p", [])),
+        },
+    }, indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+
+
+WORDS = (
+    "the elves of rivendell sang beneath the stars while glorfindel rode "
+    "toward the ford and tom bombadil wandered in the old forest far from "
+    "the shire where hobbits kept their gardens and counted their spoons"
+).split()
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng: random.Random, count: int) -> str:
+    parts: list[str] = []
+
+    for _ in range(count):
+        match rng.randrange(8):
+            case 0:
+                parts.append(f"**{words(rng, 2)}**")
+            case 1:
+                parts.append(f"_{words(rng, 2)}_")
+            case 2:
+                parts.append(f"`{rng.choice(WORDS)}()`")
+            case 3:
+                parts.append(f"[{words(rng, 2)}](/blog/{rng.choice(WORDS)})")
+            case 4:
+                parts.append(f"![{words(rng, 2)}](/images/{rng.choice(WORDS)}.png)")
+            case _:
+                parts.append(words(rng, rng.randint(4, 12)))
+
+    return " ".join(parts)
+
+
+def generate_markdown(rng: random.Random, title: str, blocks: int) -> str:
+    parts = [f"# {title}"]
+
+    for _ in range(blocks):
+        match rng.randrange(7):
+            case 0:
+                parts.append(f"{'#' * rng.randint(2, 6)} {words(rng, 5)}")
+            case 1:
+                parts.append("\n".join(f"- {inline_text(rng, 2)}" for _ in range(rng.randint(3, 30))))
+            case 2:
+                parts.append("\n".join(f"{i + 1}. {inline_text(rng, 2)}" for i in range(rng.randint(3, 30))))
+            case 3:
+                parts.append("```\n" + "\n".join(words(rng, 6) for _ in range(rng.randint(2, 20))) + "\n```")
+            case 4:
+                parts.append("\n".join(f"> {inline_text(rng, 2)}" for _ in range(rng.randint(1, 6))))
+            case _:
+                parts.append("\n".join(inline_text(rng, 6) for _ in range(rng.randint(1, 8))))
+
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(directory: str, pages: int, seed: int = 0, blocks: int = 20) -> list[str]:
+    rng = random.Random(seed)
+    paths: list[str] = []
+
+    for i in range(pages):
+        path = os.path.join(directory, f"section{i // 1000}", f"page{i}", "index.md")
+        paths.append(path)
+
+        markdown = generate_markdown(rng, f"Page {i}", blocks)
+
+        if os.path.exists(path):
+            continue
+
+        os.makedirs(os.path.split(path)[0], exist_ok=True)
+        with open(path, "w") as file:
+            file.write(markdown)
+
+    return paths
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python3 bench/corpus.py <directory> <pages>")
+        sys.exit(1)
+
+    paths = generate_corpus(sys.argv[1], int(sys.argv[2]))
+    print(f"Generated {len(paths)} pages in {sys.argv[1]}")
+
+
+if __name__ == "__main__":
+    main()
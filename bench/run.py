@@ -0,0 +1,158 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_corpus
+from main import (
+    TEMPLATE_PATH,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+    generate_pages_recursively
+)
+from blocktype import BlockType, block_to_blocktype
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+SAMPLE_PAGES = 200
+
+
+def timed(function, repeat: int = 3) -> float:
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def read_pages(paths: list[str]) -> list[str]:
+    pages: list[str] = []
+
+    for path in paths:
+        with open(path) as file:
+            pages.append(file.read())
+
+    return pages
+
+
+def bench_parser(pages: list[str]) -> dict[str, dict[str, float]]:
+    paragraphs = [
+        block.replace("\n", " ")
+        for page in pages
+        for block in markdown_to_blocks(page)
+        if block_to_blocktype(block) == BlockType.PARAGRAPH
+    ]
+    trees = [markdown_to_html_node(page) for page in pages]
+    characters = sum(len(page) for page in pages)
+
+    results: dict[str, dict[str, float]] = {}
+
+    seconds = timed(lambda: [markdown_to_html_node(page) for page in pages])
+    results["markdown_to_html_node"] = {
+        "seconds": seconds,
+        "pages": len(pages),
+        "mb_per_second": characters / seconds / 1e6,
+    }
+
+    seconds = timed(lambda: [text_to_textnodes(paragraph) for paragraph in paragraphs])
+    results["text_to_textnodes"] = {
+        "seconds": seconds,
+        "paragraphs": len(paragraphs),
+        "mb_per_second": sum(len(paragraph) for paragraph in paragraphs) / seconds / 1e6,
+    }
+
+    seconds = timed(lambda: [tree.to_html() for tree in trees])
+    results["to_html"] = {
+        "seconds": seconds,
+        "pages": len(pages),
+    }
+
+    return results
+
+
+def bench_build(corpus_dir: str, pages: int, jobs: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as out_dir:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            generate_pages_recursively(corpus_dir, TEMPLATE_PATH, out_dir, "/", jobs=jobs)
+            seconds = time.perf_counter() - start
+
+    return {
+        "seconds": seconds,
+        "pages": pages,
+        "pages_per_second": pages / seconds,
+    }
+
+
+def compare(results: dict, baseline: dict) -> None:
+    for name, result in results["benchmarks"].items():
+        if name not in baseline.get("benchmarks", {}):
+            print(f"{name:<40} (no baseline)")
+            continue
+
+        ratio = result["seconds"] / baseline["benchmarks"][name]["seconds"]
+        print(f"{name:<40}{result['seconds']:>10.3f} s{ratio:>9.2f}x baseline")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="bench/run.py")
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[1000],
+        help="comma separated corpus sizes, e.g. 1000,10000,100000"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against a previous JSON results file")
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    results: dict = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "jobs": args.jobs,
+        "benchmarks": {},
+    }
+
+    for size in args.sizes:
+        corpus_dir = os.path.join(CORPUS_DIR, f"seed{args.seed}-{size}")
+        paths = generate_corpus(corpus_dir, size, args.seed)
+
+        if size == args.sizes[0]:
+            results["benchmarks"].update(bench_parser(read_pages(paths[:SAMPLE_PAGES])))
+
+        results["benchmarks"][f"generate_pages_recursively_{size}"] = bench_build(corpus_dir, size, args.jobs)
+
+    output = json.dumps(results, indent=1)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
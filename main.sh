@@ -1,2 +1 @@
-python3 src/main.py
-cd public && python3 -m http.server 8888
+python3 src/serve.py --watch
@@ -0,0 +1,165 @@
+from typing import Iterable, Optional
+from collections import Counter
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+SCHEMA_VERSION = 2
+
+CachedBlock = tuple[str, list[str], Optional[list[str]]]
+
+
+class BlockCache():
+    path: str
+    version: str
+    counters: Counter[str]
+
+    def __init__(self, path: str, version: str) -> None:
+        directory = os.path.split(path)[0]
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.version = version
+        self.pid = os.getpid()
+        self.counters = Counter()
+        self.pending: dict[str, tuple[str, str]] = {}
+        self.touched: set[str] = set()
+
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        stored = f"{SCHEMA_VERSION}:{version}"
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+            row = self.connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != stored:
+                self.connection.execute("DROP TABLE IF EXISTS blocks")
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (stored,))
+
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT, info TEXT, size INTEGER, used REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+
+    def key(self, block_type: str, lines: list[str], basepath: str, index: bool = False) -> str:
+        digest = hashlib.sha256(f"{block_type}\0{basepath}\0{int(index)}\0".encode())
+        digest.update("\n".join(lines).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedBlock]:
+        if key in self.pending:
+            self.counters["block cache hits"] += 1
+            return load_block(*self.pending[key])
+
+        row = self.connection.execute("SELECT html, info FROM blocks WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            self.counters["block cache misses"] += 1
+            return None
+
+        self.counters["block cache hits"] += 1
+        self.touched.add(key)
+        return load_block(row[0], row[1])
+
+    def put(self, key: str, html: str, references: Iterable[str] = (), terms: Optional[Iterable[str]] = None) -> None:
+        info = json.dumps([list(references), None if terms is None else sorted(terms)], separators=(",", ":"))
+        self.pending[key] = (html, info)
+
+    def flush(self) -> None:
+        if len(self.pending) == 0 and len(self.touched) == 0:
+            return
+
+        now = time.time()
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?)",
+                [(key, html, info, len(html.encode()) + len(info), now) for key, (html, info) in self.pending.items()]
+            )
+            self.connection.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?",
+                [(now, key) for key in self.touched]
+            )
+
+        self.pending = {}
+        self.touched = set()
+
+    def size(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+
+    def evict(self, max_bytes: int) -> int:
+        self.flush()
+
+        total = self.size()
+        if total <= max_bytes:
+            return 0
+
+        evicted = 0
+        keys: list[str] = []
+
+        for key, size in self.connection.execute("SELECT key, size FROM blocks ORDER BY used"):
+            if total <= max_bytes:
+                break
+            keys.append(key)
+            total -= size
+            evicted += 1
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany("DELETE FROM blocks WHERE key = ?", [(key,) for key in keys])
+
+        return evicted
+
+    def take_counters(self) -> Counter[str]:
+        counters = self.counters
+        self.counters = Counter()
+        return counters
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+
+def load_block(html: str, info: str) -> CachedBlock:
+    references, terms = json.loads(info)
+    return html, references, terms
+
+
+def renderer_version(paths: list[str]) -> str:
+    digest = hashlib.sha256()
+
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+SETTINGS: Optional[tuple[str, str]] = None
+CACHE: Optional[BlockCache] = None
+
+
+def enable(path: str, version: str) -> None:
+    global SETTINGS
+    SETTINGS = (path, version)
+
+
+def active() -> Optional[BlockCache]:
+    global CACHE
+
+    if SETTINGS is None:
+        return None
+
+    if CACHE is None or CACHE.pid != os.getpid():
+        CACHE = BlockCache(*SETTINGS)
+
+    return CACHE
@@ -1,5 +1,5 @@
 from enum import Enum
-import re
+from typing import Iterable, Iterator
 
 
 class BlockType(Enum):
@@ -21,16 +21,77 @@ def is_ordered_list(text: str) -> bool:
     return True
 
 
-def block_to_blocktype(block: str) -> BlockType:
-    if bool(re.match(r"^#{1,6} (?!#).*", block)):
+def is_heading(line: str) -> bool:
+    level = len(line) - len(line.lstrip("#"))
+    return 1 <= level <= 6 and line[level:level + 1] == " " and line[level + 1:level + 2] != "#"
+
+
+def lines_to_blocktype(lines: list[str]) -> BlockType:
+    if is_heading(lines[0]):
         return BlockType.HEADING
-    elif block.startswith("```") and block.endswith("```"):
+    if lines[0].startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
-    elif all(line.startswith("- ") for line in block.splitlines()):
+
+    unordered = ordered = quote = True
+
+    for i, line in enumerate(lines):
+        if unordered and not line.startswith("- "):
+            unordered = False
+        if ordered and not line.startswith(f"{i+1}. "):
+            ordered = False
+        if quote and not (line.startswith("> ") or line.strip() == ">"):
+            quote = False
+        if not (unordered or ordered or quote):
+            return BlockType.PARAGRAPH
+
+    if unordered:
         return BlockType.UNORDERED_LIST
-    elif is_ordered_list(block):
+    elif ordered:
         return BlockType.ORDERED_LIST
-    elif all(line.startswith("> ") or line.strip() == ">" for line in block.splitlines()):
-        return BlockType.QUOTE
     else:
-        return BlockType.PARAGRAPH
+        return BlockType.QUOTE
+
+
+def block_to_blocktype(block: str) -> BlockType:
+    return lines_to_blocktype(block.split("\n"))
+
+
+def trim_block(lines: list[str]) -> list[str]:
+    start = 0
+    while start < len(lines) and lines[start].isspace():
+        start += 1
+
+    end = len(lines)
+    while end > start and lines[end - 1].isspace():
+        end -= 1
+
+    if start == end:
+        return []
+
+    block = lines[start:end]
+    block[0] = block[0].lstrip()
+    block[-1] = block[-1].rstrip()
+
+    return block
+
+
+def scan_blocks(markdown: str) -> Iterator[tuple[BlockType, list[str]]]:
+    return scan_block_lines(markdown.split("\n"))
+
+
+def scan_block_lines(markdown_lines: Iterable[str]) -> Iterator[tuple[BlockType, list[str]]]:
+    lines: list[str] = []
+
+    for line in markdown_lines:
+        if line != "":
+            lines.append(line)
+            continue
+
+        block = trim_block(lines)
+        if len(block) > 0:
+            yield lines_to_blocktype(block), block
+        lines = []
+
+    block = trim_block(lines)
+    if len(block) > 0:
+        yield lines_to_blocktype(block), block
@@ -0,0 +1,146 @@
+from typing import Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import os
+from output import write_output
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt")
+SIDECAR_EXTENSIONS = (".gz", ".br")
+
+
+def is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSED_EXTENSIONS
+
+
+def encodings() -> tuple[str, ...]:
+    if brotli is None:
+        return (".gz",)
+    return SIDECAR_EXTENSIONS
+
+
+def compress_data(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == ".gz":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == ".br" and brotli is not None:
+        return brotli.compress(data, quality=level)
+
+    raise Exception(f"unsupported encoding {encoding}")
+
+
+def remove_sidecars(path: str) -> list[str]:
+    removed: list[str] = []
+
+    for encoding in SIDECAR_EXTENSIONS:
+        if os.path.isfile(path + encoding):
+            os.remove(path + encoding)
+            removed.append(path + encoding)
+
+    return removed
+
+
+class CompressSettings():
+    level: int
+    min_size: int
+
+    def __init__(self, level: int = 9, min_size: int = 1024) -> None:
+        self.level = level
+        self.min_size = min_size
+
+
+class CompressReport():
+    compressed: list[str]
+    written: list[str]
+    removed: list[str]
+    sidecars: set[str]
+    bytes_saved: int
+
+    def __init__(self) -> None:
+        self.compressed = []
+        self.written = []
+        self.removed = []
+        self.sidecars = set()
+        self.bytes_saved = 0
+
+    def summary(self) -> str:
+        return (
+            f"Compressed: {len(self.compressed)} files ({', '.join(encodings())}), "
+            f"{len(self.written)} sidecars written, {len(self.removed)} removed, "
+            f"{self.bytes_saved} bytes saved"
+        )
+
+
+def compress_file(path: str, settings: CompressSettings) -> tuple[list[str], list[str], int]:
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < settings.min_size:
+        return [], remove_sidecars(path), 0
+
+    written: list[str] = []
+    saved = 0
+
+    for encoding in encodings():
+        compressed = compress_data(data, encoding, settings.level)
+        saved += len(data) - len(compressed)
+
+        if write_output(path + encoding, compressed):
+            written.append(path + encoding)
+
+    return written, [], saved
+
+
+def needs_sidecars(path: str, settings: CompressSettings) -> bool:
+    if os.path.getsize(path) < settings.min_size:
+        return any(os.path.isfile(path + encoding) for encoding in SIDECAR_EXTENSIONS)
+
+    return not all(os.path.isfile(path + encoding) for encoding in encodings())
+
+
+def compress_outputs(
+        paths: Iterable[str],
+        changed: Iterable[str],
+        settings: CompressSettings,
+        threads: int,
+        force: bool = False
+    ) -> CompressReport:
+    report = CompressReport()
+    changed = set(changed)
+    paths = sorted(path for path in set(paths) if is_compressible(path) and os.path.isfile(path))
+
+    report.compressed = [
+        path for path in paths
+        if force or path in changed or needs_sidecars(path, settings)
+    ]
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        for written, removed, saved in executor.map(lambda path: compress_file(path, settings), report.compressed):
+            report.written.extend(written)
+            report.removed.extend(removed)
+            report.bytes_saved += saved
+
+    report.sidecars = {
+        path + encoding
+        for path in paths
+        for encoding in encodings()
+        if os.path.isfile(path + encoding)
+    }
+
+    return report
+
+
+SETTINGS: Optional[CompressSettings] = None
+
+
+def enable(level: int = 9, min_size: int = 1024) -> None:
+    global SETTINGS
+    SETTINGS = CompressSettings(level, min_size)
+
+
+def active() -> Optional[CompressSettings]:
+    return SETTINGS
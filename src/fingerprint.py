@@ -0,0 +1,96 @@
+from typing import Any, Callable, Optional
+import json
+import os
+from manifest import hash_file
+from output import write_output
+from sync import is_under
+
+
+DIGEST_LENGTH = 8
+
+
+def fingerprinted_path(path: str, digest: str) -> str:
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:DIGEST_LENGTH]}{extension}"
+
+
+class Fingerprints():
+    index_path: str
+    index: dict[str, list[Any]]
+
+    def __init__(self, index_path: str) -> None:
+        self.index_path = index_path
+        self.seen: set[str] = set()
+
+        try:
+            with open(index_path) as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def digest(self, path: str) -> str:
+        stat = os.stat(path)
+        entry = self.index.get(path)
+        self.seen.add(path)
+
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return entry[2]
+
+        digest = hash_file(path)
+        self.index[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def rename(self, from_path: str, dest_path: str) -> str:
+        return fingerprinted_path(dest_path, self.digest(from_path))
+
+    def save(self) -> None:
+        self.index = { path: entry for path, entry in self.index.items() if path in self.seen }
+
+        directory = os.path.split(self.index_path)[0]
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        write_output(self.index_path, json.dumps(self.index, indent=1, sort_keys=True))
+
+
+def asset_urls(assets: dict[str, str], from_dir: str, to_dir: str) -> dict[str, str]:
+    urls: dict[str, str] = {}
+
+    for dest_path, from_path in assets.items():
+        if not is_under(from_path, from_dir):
+            continue
+
+        url = "/" + os.path.relpath(from_path, from_dir).replace(os.sep, "/")
+        fingerprinted = "/" + os.path.relpath(dest_path, to_dir).replace(os.sep, "/")
+
+        if url != fingerprinted:
+            urls[url] = fingerprinted
+
+    return dict(sorted(urls.items()))
+
+
+def write_asset_manifest(path: str, urls: dict[str, str]) -> bool:
+    return write_output(path, json.dumps(urls, indent=1, sort_keys=True) + "\n")
+
+
+ASSETS: Optional[dict[str, str]] = None
+CHANGE_HOOKS: list[Callable[[], None]] = []
+
+
+def enable(urls: Optional[dict[str, str]]) -> None:
+    global ASSETS
+
+    if urls != ASSETS:
+        ASSETS = urls
+
+        for hook in CHANGE_HOOKS:
+            hook()
+
+
+def active() -> Optional[dict[str, str]]:
+    return ASSETS
+
+
+def lookup(url: str) -> str:
+    if ASSETS is None:
+        return url
+    return ASSETS.get(url, url)
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from main import build, inline_html
+from template import clear_template_cache
+import compress
+import fingerprint
+import images
+import minify
+import siteindex
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, contents):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.split(path)[0], exist_ok=True)
+
+        with open(path, "wb" if isinstance(contents, bytes) else "w") as file:
+            file.write(contents)
+
+        return path
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as file:
+            return file.read()
+
+
+class SiteTestCase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[Contact](/contact)")
+        self.write(os.path.join("content", "contact", "index.md"), "# Contact")
+        self.write(os.path.join("static", "index.css"), "body { color: red; }\n" * 100)
+
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+        self.output = io.StringIO()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        clear_template_cache()
+        inline_html.cache_clear()
+        compress.SETTINGS = None
+        fingerprint.ASSETS = None
+        images.IMAGES = None
+        minify.SETTINGS = None
+        minify.CACHE = None
+        siteindex.SEARCH_INDEX = False
+        super().tearDown()
+
+    def build(self, **options):
+        with contextlib.redirect_stdout(self.output):
+            return build(**options)
+
+    def lines(self, path):
+        return self.read(path).splitlines()
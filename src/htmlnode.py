@@ -1,8 +1,14 @@
-from typing import Optional
-from functools import reduce
+from typing import Optional, Iterator, TextIO
 
 
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
+    tag: Optional[str]
+    value: Optional[str]
+    children: Optional[list['HTMLNode']]
+    props: Optional[dict[str,str]]
+
     def __init__(
             self, 
             tag: Optional[str] = None, 
@@ -17,12 +23,19 @@ class HTMLNode():
         self.props = props
 
     def to_html(self) -> str:
+        return "".join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
         raise NotImplementedError("child classes should implement this method")
 
+    def write_html(self, stream: TextIO) -> None:
+        for chunk in self.iter_html():
+            stream.write(chunk)
+
     def props_to_html(self) -> str:
         if not isinstance(self.props, dict):
             return ""
-        return reduce(lambda acc, pair: acc + f' {pair[0]}="{pair[1]}"', self.props.items(), "")
+        return "".join(f' {key}="{value}"' for key, value in self.props.items())
 
     def __repr__(self) -> str:
         tag = f'"{self.tag}"' if isinstance(self.tag, str) else "None"
@@ -34,13 +47,18 @@ class HTMLNode():
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
             self, 
             tag: Optional[str],
             value: str,
             props: Optional[dict[str,str]] = None
         ) -> None:
-        super().__init__(tag, value, None, props)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
 
     def to_html(self) -> str:
         if not isinstance(self.value, str):
@@ -51,21 +69,31 @@ class LeafNode(HTMLNode):
         else:
             return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self) -> Iterator[str]:
+        yield self.to_html()
+
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
             self,
             tag: str,
             children: list[HTMLNode],
             props: Optional[dict[str,str]] = None
         ) -> None:
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
 
-    def to_html(self) -> str:
+    def iter_html(self) -> Iterator[str]:
         if not isinstance(self.tag, str) or self.tag == "":
             raise ValueError("tag is required for a parent node")
         if not isinstance(self.children, list) or len(self.children) == 0:
             raise ValueError("children are required for a parent node")
 
-        value = reduce(lambda acc, child: acc + child.to_html(), self.children, "")
-        return f'<{self.tag}{self.props_to_html()}>{value}</{self.tag}>'
+        yield f'<{self.tag}{self.props_to_html()}>'
+        for child in self.children:
+            yield from child.iter_html()
+        yield f'</{self.tag}>'
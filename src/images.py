@@ -0,0 +1,236 @@
+from typing import Any, BinaryIO, Callable, Optional
+import json
+import os
+import struct
+from manifest import hash_file
+from output import write_output
+import fingerprint
+from sync import collect_files, is_up_to_date, sync_file
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+IMAGE_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg")
+VARIANT_WIDTHS = (480, 960)
+JPEG_FRAME_MARKERS = { 0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF }
+
+
+def image_size(path: str) -> Optional[tuple[int, int]]:
+    with open(path, "rb") as file:
+        header = file.read(26)
+
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:2] == b"\xff\xd8":
+            file.seek(2)
+            return jpeg_size(file)
+
+    return None
+
+
+def jpeg_size(file: BinaryIO) -> Optional[tuple[int, int]]:
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        if marker[1] == 0x01 or 0xD0 <= marker[1] <= 0xD8:
+            continue
+
+        length = file.read(2)
+        if len(length) < 2:
+            return None
+
+        if marker[1] in JPEG_FRAME_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+
+        file.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+def settings() -> str:
+    if Image is None:
+        return "no variants"
+    return "variants " + ",".join(str(width) for width in VARIANT_WIDTHS)
+
+
+def variant_path(path: str, width: int, digest: Optional[str] = None) -> str:
+    root, extension = os.path.splitext(path)
+    path = f"{root}-{width}w{extension}"
+
+    if digest is not None:
+        return fingerprint.fingerprinted_path(path, digest)
+    return path
+
+
+class ImageInfo():
+    url: str
+    width: int
+    height: int
+    variants: list[int]
+    digest: Optional[str]
+
+    def __init__(self, url: str, width: int, height: int, variants: list[int], digest: Optional[str] = None) -> None:
+        self.url = url
+        self.width = width
+        self.height = height
+        self.variants = variants
+        self.digest = digest
+
+    def attributes(self, basepath: str = "/") -> dict[str, str]:
+        props = { "width": str(self.width), "height": str(self.height) }
+
+        if len(self.variants) > 0:
+            props["srcset"] = ", ".join(
+                [f"{basepath}{variant_path(self.url, width, self.digest)[1:]} {width}w" for width in self.variants]
+                + [f"{basepath}{fingerprint.lookup(self.url)[1:]} {self.width}w"]
+            )
+
+        props["loading"] = "lazy"
+        return props
+
+
+class ImageReport():
+    images: dict[str, ImageInfo]
+    variants: dict[str, str]
+    written: list[str]
+    removed: list[str]
+
+    def __init__(self) -> None:
+        self.images = {}
+        self.variants = {}
+        self.written = []
+        self.removed = []
+
+    def summary(self) -> str:
+        variants = "" if Image is not None else " (install Pillow for resized variants)"
+        return f"Images: {len(self.images)} measured, {len(self.variants)} variants, {len(self.written)} written{variants}"
+
+
+class ImagePipeline():
+    cache_dir: str
+    widths: tuple[int, ...]
+    index: dict[str, list[Any]]
+
+    def __init__(self, cache_dir: str, widths: tuple[int, ...] = VARIANT_WIDTHS) -> None:
+        self.cache_dir = cache_dir
+        self.widths = widths
+        self.index = {}
+        self.index_path = os.path.join(cache_dir, "index.json")
+
+        try:
+            with open(self.index_path) as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def measure(self, path: str) -> Optional[tuple[str, int, int]]:
+        stat = os.stat(path)
+        entry = self.index.get(path)
+
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return entry[2], entry[3], entry[4]
+
+        size = image_size(path)
+        if size is None:
+            return None
+
+        digest = hash_file(path)
+        self.index[path] = [stat.st_mtime_ns, stat.st_size, digest, size[0], size[1]]
+        return digest, size[0], size[1]
+
+    def variant(self, path: str, digest: str, width: int, height: int) -> str:
+        cached = os.path.join(self.cache_dir, f"{digest}-{width}{os.path.splitext(path)[1]}")
+
+        if not os.path.exists(cached) and Image is not None:
+            with Image.open(path) as image:
+                resized = image.resize((width, height), Image.LANCZOS)
+                temp = f"{cached}.{os.getpid()}.tmp"
+                resized.save(temp, format=image.format)
+                os.replace(temp, cached)
+
+        return cached
+
+    def process(self, from_dir: str, to_dir: str, fingerprinted: bool = False) -> ImageReport:
+        report = ImageReport()
+        measured_paths: set[str] = set()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        for from_path, dest_path in collect_files(from_dir, to_dir):
+            if os.path.splitext(from_path)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+
+            measured_paths.add(from_path)
+
+            measured = self.measure(from_path)
+            if measured is None:
+                continue
+
+            digest, width, height = measured
+            variant_digest = digest if fingerprinted else None
+            url = "/" + os.path.relpath(dest_path, to_dir).replace(os.sep, "/")
+            widths: list[int] = []
+
+            if Image is not None:
+                for variant_width in self.widths:
+                    if variant_width >= width:
+                        continue
+
+                    variant_height = max(1, round(height * variant_width / width))
+                    cached = self.variant(from_path, digest, variant_width, variant_height)
+                    variant_dest = variant_path(dest_path, variant_width, variant_digest)
+
+                    if not is_up_to_date(cached, variant_dest):
+                        sync_file(cached, variant_dest)
+                        report.written.append(variant_dest)
+
+                    report.variants[variant_dest] = cached
+                    widths.append(variant_width)
+
+            report.images[url] = ImageInfo(url, width, height, widths, variant_digest)
+
+        self.index = { path: entry for path, entry in self.index.items() if path in measured_paths }
+        write_output(self.index_path, json.dumps(self.index, indent=1, sort_keys=True))
+        self.prune(set(report.variants.values()))
+
+        return report
+
+    def prune(self, keep: set[str]) -> None:
+        keep = { os.path.normpath(path) for path in keep } | { os.path.normpath(self.index_path) }
+
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.normpath(entry.path) not in keep:
+                    os.remove(entry.path)
+
+
+IMAGES: Optional[dict[str, ImageInfo]] = None
+CHANGE_HOOKS: list[Callable[[], None]] = []
+
+
+def enable(images: Optional[dict[str, ImageInfo]]) -> None:
+    global IMAGES
+
+    if images is not IMAGES:
+        IMAGES = images
+
+        for hook in CHANGE_HOOKS:
+            hook()
+
+
+def active() -> Optional[dict[str, ImageInfo]]:
+    return IMAGES
+
+
+def lookup(url: str) -> Optional[ImageInfo]:
+    if IMAGES is None:
+        return None
+    return IMAGES.get(url)
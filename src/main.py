@@ -1,20 +1,116 @@
-from typing import Optional
+from typing import Callable, Optional, Iterable, Iterator
 import re
-import os, shutil
+import os
 import sys
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from functools import lru_cache
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, ParentNode, LeafNode
-from blocktype import BlockType, block_to_blocktype
+import blocktype
+from blocktype import BlockType, scan_blocks, scan_block_lines
+from manifest import BuildManifest, prune_empty_dirs, remove_untracked
+from template import (
+    Template,
+    TemplateKey,
+    load_template,
+    load_templates,
+    preload_templates,
+    clear_template_cache,
+    template_urls
+)
+from sync import SyncReport, sync_directory, is_under
+import pipeline
+from pipeline import ReadAhead, WriteBehind, make_dirs
+from output import AtomicOutput, write_output
+import profiling
+import blockcache
+import siteindex
+import images
+from images import ImagePipeline, ImageReport
+import minify
+import compress
+import fingerprint
+from fingerprint import Fingerprints, asset_urls, write_asset_manifest
+from siteindex import page_url, absolute_url, write_sitemap, write_feed, write_search_index
 
 
 ROOT_PATH_DIR = "./"
 STATIC_PATH_DIR = "./static"
 CONTENT_PATH_DIR = "./content"
 PUBLIC_PATH_DIR = "./docs"
+BLOG_PATH_DIR = os.path.join(CONTENT_PATH_DIR, "blog")
+SITEMAP_PATH = os.path.join(PUBLIC_PATH_DIR, "sitemap.xml")
+FEED_PATH = os.path.join(PUBLIC_PATH_DIR, "blog", "feed.xml")
+SEARCH_INDEX_PATH = os.path.join(PUBLIC_PATH_DIR, "search.json")
+ASSET_MANIFEST_PATH = os.path.join(PUBLIC_PATH_DIR, "assets.json")
 TEMPLATE_PATH = os.path.join(ROOT_PATH_DIR, "template.html")
-
-
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+TEMPLATE_FILENAME = "_template.html"
+BUILD_CACHE_DIR = os.path.join(ROOT_PATH_DIR, ".build")
+MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, "manifest.json")
+PROFILE_PATH = os.path.join(BUILD_CACHE_DIR, "profile.json")
+BLOCK_CACHE_PATH = os.path.join(BUILD_CACHE_DIR, "blocks.sqlite")
+CHANGED_PATH = os.path.join(BUILD_CACHE_DIR, "changed.txt")
+REMOVED_PATH = os.path.join(BUILD_CACHE_DIR, "removed.txt")
+IMAGE_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "images")
+MINIFY_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "minify")
+FINGERPRINT_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "fingerprints.json")
+MINIFIED_ASSET_EXTENSIONS = (".css",)
+RENDERER_SOURCES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    for filename in ("main.py", "blocktype.py", "htmlnode.py", "textnode.py")
+]
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_MARKUP_PATTERN = re.compile(r"[!\[*_`]")
+INLINE_PATTERN = re.compile(
+    r"!\[(?P<image_text>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\)"
+    r"|\*\*(?P<bold>.*?)\*\*"
+    r"|_(?P<italic>.*?)_"
+    r"|`(?P<code>.*?)`",
+    re.DOTALL
+)
+INLINE_DELIMITERS = ("**", "_", "`")
+INLINE_MEMO_SIZE = 8192
+INLINE_MEMO_MAX_LENGTH = 256
+PIPELINE_DEPTH = 16
+PIPELINE_THREADS = 4
+PIPELINE_MAX_PAGE_SIZE = 1024 * 1024
+
+PROFILED_STAGES = [
+    "read_source",
+    "read_title",
+    "page_template",
+    "render_page",
+    "generate_page",
+    "block_to_html_node",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+]
+PROFILED_BLOCK_STAGES = [
+    "trim_block",
+    "lines_to_blocktype",
+]
+PROFILED_PIPELINE_STAGES = [
+    "write_output",
+]
+
+BUILD_COUNTERS: Counter[str] = Counter()
+INLINE_MEMO_SEEN: list[int] = [0, 0]
+
+
+def resolve_url(url: str, basepath: str = "/") -> str:
+    if url.startswith("/"):
+        return basepath + fingerprint.lookup(url)[1:]
+    return url
+
+
+def text_node_to_html_node(text_node: TextNode, basepath: str = "/") -> LeafNode:
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -26,12 +122,18 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
             if isinstance(text_node.url, str):
-                return LeafNode("a", text_node.text, { "href": text_node.url })
+                return LeafNode("a", text_node.text, { "href": resolve_url(text_node.url, basepath) })
             else:
                 return LeafNode("a", text_node.text, { "href": "" })
         case TextType.IMAGE:
             if isinstance(text_node.url, str):
-                return LeafNode("img", "", { "src": text_node.url, "alt": text_node.text })
+                props = { "src": resolve_url(text_node.url, basepath), "alt": text_node.text }
+
+                image = images.lookup(text_node.url)
+                if image is not None:
+                    props.update(image.attributes(basepath))
+
+                return LeafNode("img", "", props)
             else:
                 return LeafNode("img", "", { "src": "", "alt": text_node.text })
         case _:
@@ -42,7 +144,7 @@ def split_nodes_delimiter(old_nodes: list['TextNode'], delimiter: str, text_type
     new_nodes: list['TextNode'] = []
     
     for node in old_nodes:
-        if node.text_type != TextType.TEXT:
+        if node.text_type != TextType.TEXT or delimiter not in node.text:
             new_nodes.append(node)
             continue
 
@@ -61,12 +163,12 @@ def split_nodes_delimiter(old_nodes: list['TextNode'], delimiter: str, text_type
 
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 
@@ -153,107 +255,252 @@ def split_nodes_link(old_nodes: list['TextNode']) -> list['TextNode']:
 
 
 def text_to_textnodes(text: str) -> list['TextNode']:
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    if INLINE_MARKUP_PATTERN.search(text) is None:
+        return [TextNode(text, TextType.TEXT)]
+
+    nodes: list['TextNode'] = []
+    position = 0
+
+    for token in INLINE_PATTERN.finditer(text):
+        if token.start() > position:
+            nodes.append(plain_text_node(text[position:token.start()]))
+
+        match token.lastgroup:
+            case "image_url":
+                nodes.append(TextNode(token["image_text"], TextType.IMAGE, token["image_url"]))
+            case "link_url":
+                nodes.append(TextNode(token["link_text"], TextType.LINK, token["link_url"]))
+            case "bold":
+                nodes.append(TextNode(token["bold"], TextType.BOLD))
+            case "italic":
+                nodes.append(TextNode(token["italic"], TextType.ITALIC))
+            case "code":
+                nodes.append(TextNode(token["code"], TextType.CODE))
+
+        position = token.end()
+
+    if position < len(text) or len(nodes) == 0:
+        nodes.append(plain_text_node(text[position:]))
 
     return nodes
 
 
+def plain_text_node(text: str) -> TextNode:
+    for delimiter in INLINE_DELIMITERS:
+        if delimiter in text:
+            raise Exception("invalid markdown syntax: unterminated element")
+
+    return TextNode(text, TextType.TEXT)
+
+
 def markdown_to_blocks(markdown: str) -> list[str]:
-    blocks = markdown.split("\n\n")
-    blocks = list(map(lambda x: x.strip(), blocks))
-    blocks = list(filter(lambda x: x != "", blocks))
-    return blocks
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown)]
 
 
-def text_to_html_nodes(text: str, parent_tag: str = "div"):
+def text_to_html_nodes(text: str, parent_tag: str = "div", basepath: str = "/", info: Optional['PageInfo'] = None):
     children: list[HTMLNode] = []
+    nodes = text_to_textnodes(text)
 
-    for node in text_to_textnodes(text):
-        html_node = text_node_to_html_node(node)
+    if info is not None:
+        info.add_nodes(nodes)
+
+    for node in nodes:
+        html_node = text_node_to_html_node(node, basepath)
         children.append(html_node)
 
     return ParentNode(parent_tag, children)
+
+
+@lru_cache(maxsize=INLINE_MEMO_SIZE)
+def inline_html(text: str, parent_tag: str, basepath: str, index: bool = False) -> tuple[str, tuple[str, ...], frozenset[str]]:
+    info = PageInfo(index)
+    html = text_to_html_nodes(text, parent_tag, basepath, info).to_html()
+    return html, tuple(info.references), frozenset(info.terms or ())
+
+
+images.CHANGE_HOOKS.append(inline_html.cache_clear)
+fingerprint.CHANGE_HOOKS.append(inline_html.cache_clear)
+
+
+def inline_to_html_node(
+        text: str,
+        parent_tag: str = "div",
+        basepath: str = "/",
+        info: Optional['PageInfo'] = None,
+        memo: bool = False
+    ) -> HTMLNode:
+    if not memo or len(text) > INLINE_MEMO_MAX_LENGTH:
+        return text_to_html_nodes(text, parent_tag, basepath, info)
+
+    html, references, terms = inline_html(text, parent_tag, basepath, info is not None and info.terms is not None)
+
+    if info is not None:
+        info.merge(references, terms)
+
+    return LeafNode(None, html)
     
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    blocks = markdown_to_blocks(markdown)
+def block_to_html_node(
+        block_type: BlockType,
+        lines: list[str],
+        basepath: str = "/",
+        info: Optional['PageInfo'] = None,
+        memo: bool = False
+    ) -> HTMLNode:
+    match block_type:
+        case BlockType.HEADING:
+            tag, text = "\n".join(lines).split(" ", maxsplit=1)
+            return inline_to_html_node(text, f"h{tag.count("#")}", basepath, info, memo)
+
+        case BlockType.QUOTE:
+            text = "".join(line.strip().lstrip("> ") for line in lines)
+            return inline_to_html_node(text, f"blockquote", basepath, info, memo)
+
+        case BlockType.UNORDERED_LIST:
+            return ParentNode("ul", [
+                inline_to_html_node(line.strip().lstrip("- "), f"li", basepath, info, memo)
+                for line in lines
+            ])
+
+        case BlockType.ORDERED_LIST:
+            return ParentNode("ol", [
+                inline_to_html_node(line.strip().lstrip(f"{i+1}. "), f"li", basepath, info, memo)
+                for i, line in enumerate(lines)
+            ])
+
+        case BlockType.CODE:
+            return ParentNode("pre", [LeafNode("code", "\n".join(lines).strip("```").lstrip())])
+
+        case BlockType.PARAGRAPH:
+            return inline_to_html_node(" ".join(lines), f"p", basepath, info, memo)
+
+        case _:
+            raise Exception("invalid BlockType value")
+
 
-    root = ParentNode("div", [])
+def markdown_to_html_node(markdown: str, basepath: str = "/", info: Optional['PageInfo'] = None) -> ParentNode:
+    children: list[HTMLNode] = [
+        block_to_html_node(block_type, lines, basepath, info)
+        for block_type, lines in scan_blocks(markdown)
+    ]
 
-    if not isinstance(root.children, list):
-        raise Exception("")
+    return ParentNode("div", children)
 
-    for block in blocks:
-        match block_to_blocktype(block):
-            case BlockType.HEADING:
-                tag, text = block.split(" ", maxsplit=1)
 
-                root.children.append(
-                    text_to_html_nodes(text, f"h{tag.count("#")}")
-                )
+class PageInfo():
+    title: str
+    references: list[str]
+    terms: Optional[set[str]]
 
-            case BlockType.QUOTE:
-                text = ""
+    def __init__(self, index: bool = False) -> None:
+        self.title = ""
+        self.references = []
+        self.terms = set() if index else None
 
-                for line in block.split("\n"):
-                    text += line.strip().lstrip("> ")
+    def add_nodes(self, nodes: list[TextNode]) -> None:
+        for node in nodes:
+            if node.text_type in (TextType.LINK, TextType.IMAGE) and isinstance(node.url, str):
+                self.references.append(node.url)
 
-                root.children.append(
-                    text_to_html_nodes(text, f"blockquote")
-                )
+        if self.terms is not None:
+            self.terms.update(siteindex.text_terms(" ".join(node.text for node in nodes)))
 
-            case BlockType.UNORDERED_LIST:
-                list_node = ParentNode("ul", [])
+    def merge(self, references: Iterable[str], terms: Optional[Iterable[str]]) -> None:
+        self.references.extend(references)
 
-                if not isinstance(list_node.children, list):
-                    raise Exception("")
+        if self.terms is not None and terms is not None:
+            self.terms.update(terms)
 
-                for line in block.split("\n"):
-                    list_node.children.append(
-                        text_to_html_nodes(line.strip().lstrip("- "), f"li")
-                    )
 
-                root.children.append(list_node)
+def is_cacheable_block(lines: list[str]) -> bool:
+    if images.active() is not None and any("![" in line for line in lines):
+        return False
+    if fingerprint.active() is not None and any("](" in line for line in lines):
+        return False
+    return True
 
-            case BlockType.ORDERED_LIST:
-                list_node = ParentNode("ol", [])
 
-                if not isinstance(list_node.children, list):
-                    raise Exception("")
+def markdown_lines_to_html(
+        lines: Iterable[str],
+        basepath: str = "/",
+        info: Optional[PageInfo] = None
+    ) -> Iterator[str]:
+    cache = blockcache.active()
+    index = info is not None and info.terms is not None
+    empty = True
+    yield "<div>"
 
-                for i, line in enumerate(block.split("\n")):
-                    list_node.children.append(
-                        text_to_html_nodes(line.strip().lstrip(f"{i+1}. "), f"li")
-                    )
+    for block_type, block in scan_block_lines(lines):
+        empty = False
 
-                root.children.append(list_node)
+        if cache is None or not is_cacheable_block(block):
+            yield from block_to_html_node(block_type, block, basepath, info, True).iter_html()
+            continue
 
-            case BlockType.CODE:
-                root.children.append(
-                    ParentNode("pre", [LeafNode("code", block.strip("```").lstrip())])
-                )
+        key = cache.key(block_type.value, block, basepath, index)
+        cached = cache.get(key)
+
+        if cached is None:
+            block_info = PageInfo(index)
+            html = block_to_html_node(block_type, block, basepath, block_info, True).to_html()
+            cache.put(key, html, block_info.references, block_info.terms)
+            references, terms = block_info.references, block_info.terms
+        else:
+            html, references, terms = cached
 
-            case BlockType.PARAGRAPH:
-                root.children.append(
-                    text_to_html_nodes(block.replace("\n", " "), f"p")
-                )
+        if info is not None:
+            info.merge(references, terms)
 
-    return root
+        yield html
 
+    if empty:
+        raise ValueError("children are required for a parent node")
 
-def copy_static_files():
+    yield "</div>"
+
+
+def copy_static_files(
+        manifest: Optional[BuildManifest] = None,
+        link: bool = False,
+        checksum: bool = False,
+        fingerprints: Optional[Fingerprints] = None
+    ) -> SyncReport:
     if not os.path.exists(STATIC_PATH_DIR) or not os.path.exists(CONTENT_PATH_DIR):
        print("Exiting...")
 
-    if os.path.exists(PUBLIC_PATH_DIR):
-        shutil.rmtree(PUBLIC_PATH_DIR)
+    exclude = is_minified_asset if minify.active() is not None else None
+    rename = fingerprints.rename if fingerprints is not None else None
+    report = sync_directory(STATIC_PATH_DIR, PUBLIC_PATH_DIR, manifest, link, checksum, exclude, rename)
+    print(report.summary())
+
+    return report
+
+
+def is_minified_asset(path: str) -> bool:
+    return os.path.splitext(path)[1] in MINIFIED_ASSET_EXTENSIONS
+
+
+def minify_static_file(from_path: str, dest_path: str) -> bool:
+    minifier = minify.active()
+    if minifier is None:
+        raise Exception("minification is not enabled")
+
+    css = read_contents(from_path)
+    minified = minifier.minify("css", css)
+    minifier.counters["css bytes saved by minify"] += len(css.encode()) - len(minified.encode())
+
+    return write_output(dest_path, minified)
 
-    shutil.copytree(STATIC_PATH_DIR, PUBLIC_PATH_DIR)
+
+def minify_static_files(manifest: BuildManifest) -> list[str]:
+    assets = [
+        (from_path, dest_path)
+        for dest_path, from_path in sorted(manifest.assets.items())
+        if is_minified_asset(from_path) and is_under(from_path, STATIC_PATH_DIR)
+    ]
+    make_dirs(dest_path for _, dest_path in assets)
+
+    return [dest_path for from_path, dest_path in assets if minify_static_file(from_path, dest_path)]
 
 
 def extract_title(markdown: str) -> str:
@@ -270,64 +517,829 @@ def read_contents(path: str) -> str:
         return file.read()
 
 
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+def read_lines(path: str) -> Iterator[str]:
+    with open(path) as file:
+        for line in file:
+            yield line.removesuffix("\n")
 
-    from_file = read_contents(from_path)
-    template_file = read_contents(template_path)
 
-    title = extract_title(from_file)
-    html = markdown_to_html_node(from_file).to_html()
+def read_title(path: str) -> str:
+    header: list[str] = []
 
-    page = (
-        template_file
-            .replace("{{ Title }}", title)
-            .replace("{{ Content }}", html)
-            .replace('href="/', f'href="{basepath}')
-            .replace('src="/', f'src="{basepath}')
-    )
+    for line in read_lines(path):
+        header.append(line)
+        if line != "":
+            break
+
+    return extract_title("\n".join(header))
+
+
+def generate_page(
+        from_path: str,
+        template_path: str,
+        dest_path: str,
+        basepath: str,
+        info: Optional[PageInfo] = None
+    ) -> bool:
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+
+    template = page_template(template_path, basepath)
+    title = read_title(from_path)
+
+    if info is not None:
+        info.title = title
 
     if not os.path.exists(os.path.split(dest_path)[0]):
         os.makedirs(os.path.split(dest_path)[0])
 
-    with open(dest_path, "x") as file:
-        file.write(page)
+    output = AtomicOutput(dest_path)
 
+    with output as file:
+        template.write(file, {
+            "Title": title,
+            "Content": lambda: markdown_lines_to_html(read_lines(from_path), basepath, info),
+        })
 
-def generate_pages_recursively(from_dir: str, template_path: str, to_dir: str, basepath: str):
-    paths = os.listdir(from_dir)
+    cache = blockcache.active()
+    if cache is not None:
+        cache.flush()
+
+    return output.changed
+
+
+def page_template(template_path: str, basepath: str) -> Template:
+    minifier = minify.active()
+    template = load_template(template_path, basepath, minifier is not None)
+
+    if minifier is not None and template.saved > 0:
+        minifier.counters["html bytes saved by minify"] += template.saved
+
+    return template
+
+
+def read_source(path: str) -> Optional[str]:
+    if os.path.getsize(path) > PIPELINE_MAX_PAGE_SIZE:
+        return None
+    return read_contents(path)
 
-    for path in paths:
-        if os.path.isfile(os.path.join(from_dir, path)):
-            filename, extension = os.path.splitext(path)
+
+def render_page(contents: str, template_path: str, basepath: str, info: Optional[PageInfo] = None) -> str:
+    template = page_template(template_path, basepath)
+    title = extract_title(contents)
+
+    if info is not None:
+        info.title = title
+
+    return template.render({
+        "Title": title,
+        "Content": lambda: markdown_lines_to_html(contents.split("\n"), basepath, info),
+    })
+
+
+def content_dest_path(from_path: str, from_dir: str, to_dir: str) -> str:
+    filename = os.path.splitext(os.path.relpath(from_path, from_dir))[0]
+    return os.path.join(to_dir, f"{filename}.html")
+
+
+def collect_pages(from_dir: str, to_dir: str, template_path: str) -> list[tuple[str, str, str]]:
+    pages: list[tuple[str, str, str]] = []
+
+    with os.scandir(from_dir) as iterator:
+        entries = sorted(iterator, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if entry.name == TEMPLATE_FILENAME and entry.is_file():
+            template_path = entry.path
+
+    for entry in entries:
+        if entry.is_dir():
+            pages.extend(collect_pages(entry.path, os.path.join(to_dir, entry.name), template_path))
+        elif entry.is_file():
+            filename, extension = os.path.splitext(entry.name)
 
             if extension == ".md":
-                generate_page(
-                    os.path.join(from_dir, f"{filename}.md"),
-                    template_path,
-                    os.path.join(to_dir, f"{filename}.html"),
-                    basepath
-                )
-        else:
-            generate_pages_recursively(
-                os.path.join(from_dir, path), 
-                template_path, 
-                os.path.join(to_dir, path),
-                basepath
+                pages.append((entry.path, template_path, os.path.join(to_dir, f"{filename}.html")))
+
+    return pages
+
+
+def walk_pages(from_dir: str, to_dir: str, template_path: str) -> list[tuple[str, str, str]]:
+    start = time.perf_counter()
+    pages = collect_pages(from_dir, to_dir, template_path)
+    seconds = time.perf_counter() - start
+
+    profiler = profiling.active()
+    if profiler is not None:
+        profiler.record("walk", seconds)
+
+    templates = len({ template_path for _, template_path, _ in pages })
+    print(f"Found {len(pages)} pages using {templates} template(s) in {from_dir} in {seconds * 1000:.1f} ms")
+
+    return pages
+
+
+def page_template_path(
+        from_path: str,
+        from_dir: str,
+        template_path: str,
+        exists: Callable[[str], bool] = os.path.isfile
+    ) -> str:
+    directory = os.path.split(from_path)[0]
+
+    while is_under(directory, from_dir):
+        candidate = os.path.join(directory, TEMPLATE_FILENAME)
+        if exists(candidate):
+            return candidate
+        directory = os.path.split(directory)[0]
+
+    return template_path
+
+
+def enable_profiling() -> profiling.Profiler:
+    profiler = profiling.enable()
+    profiler.instrument(globals(), PROFILED_STAGES)
+    profiler.instrument(vars(blocktype), PROFILED_BLOCK_STAGES)
+    profiler.instrument(vars(pipeline), PROFILED_PIPELINE_STAGES)
+    return profiler
+
+
+def take_counters() -> Counter[str]:
+    counters: Counter[str] = Counter()
+
+    cache = blockcache.active()
+    if cache is not None:
+        counters.update(cache.take_counters())
+
+    minifier = minify.active()
+    if minifier is not None:
+        counters.update(minifier.take_counters())
+
+    info = inline_html.cache_info()
+    counters["inline memo hits"] += info.hits - INLINE_MEMO_SEEN[0]
+    counters["inline memo misses"] += info.misses - INLINE_MEMO_SEEN[1]
+    INLINE_MEMO_SEEN[:] = [info.hits, info.misses]
+
+    return +counters
+
+
+def format_counters(counters: Counter[str]) -> str:
+    return ", ".join(f"{name}: {count}" for name, count in sorted(counters.items()))
+
+
+def init_worker(
+        profile: bool,
+        block_cache_settings: Optional[tuple[str, str]],
+        search_index: bool,
+        image_info: Optional[dict[str, images.ImageInfo]],
+        minify_settings: Optional[str],
+        asset_urls: Optional[dict[str, str]],
+        templates: dict[TemplateKey, Template]
+    ) -> None:
+    if profile:
+        enable_profiling()
+    if block_cache_settings is not None:
+        blockcache.enable(*block_cache_settings)
+    if search_index:
+        siteindex.enable()
+    if image_info is not None:
+        images.enable(image_info)
+    if minify_settings is not None:
+        minify.enable(minify_settings)
+    if asset_urls is not None:
+        fingerprint.enable(asset_urls)
+    preload_templates(templates)
+
+
+class PageResult():
+    dest_path: str
+    info: PageInfo
+    changed: bool
+    counters: Counter[str]
+    profile: Optional[dict[str, list[float]]]
+
+    def __init__(
+            self,
+            dest_path: str,
+            info: PageInfo,
+            changed: bool,
+            counters: Counter[str],
+            profile: Optional[dict[str, list[float]]] = None
+        ) -> None:
+        self.dest_path = dest_path
+        self.info = info
+        self.changed = changed
+        self.counters = counters
+        self.profile = profile
+
+
+def generate_page_item(item: tuple[str, str, str, str]) -> PageResult:
+    from_path, template_path, dest_path, basepath = item
+    profiler = profiling.active()
+    info = PageInfo(siteindex.active())
+
+    if profiler is not None:
+        profiler.begin_page()
+
+    try:
+        changed = generate_page(from_path, template_path, dest_path, basepath, info)
+    except Exception as error:
+        raise Exception(f"failed to generate page from {from_path}: {error}") from error
+
+    if profiler is not None:
+        return PageResult(dest_path, info, changed, take_counters(), profiler.end_page())
+
+    return PageResult(dest_path, info, changed, take_counters())
+
+
+def generate_page_batch(items: list[tuple[str, str, str, str]]) -> list[PageResult]:
+    profiler = profiling.active()
+    results: list[PageResult] = []
+    written: list[PageResult] = []
+    sources = ReadAhead([from_path for from_path, _, _, _ in items], read_source, PIPELINE_DEPTH, PIPELINE_THREADS)
+
+    with sources, WriteBehind(PIPELINE_DEPTH, PIPELINE_THREADS) as writer:
+        reads = iter(sources)
+
+        for item in items:
+            from_path, template_path, dest_path, basepath = item
+
+            try:
+                _, contents = next(reads)
+            except Exception as error:
+                raise Exception(f"failed to generate page from {from_path}: {error}") from error
+
+            if contents is None:
+                results.append(generate_page_item(item))
+                continue
+
+            print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+            info = PageInfo(siteindex.active())
+
+            if profiler is not None:
+                profiler.begin_page()
+
+            try:
+                page = render_page(contents, template_path, basepath, info)
+            except Exception as error:
+                raise Exception(f"failed to generate page from {from_path}: {error}") from error
+
+            writer.write(dest_path, page)
+            profile = profiler.end_page() if profiler is not None else None
+            written.append(PageResult(dest_path, info, False, take_counters(), profile))
+            results.append(written[-1])
+
+    changed = set(writer.changed)
+    for result in written:
+        result.changed = result.dest_path in changed
+
+    cache = blockcache.active()
+    if cache is not None:
+        cache.flush()
+
+    return results
+
+
+def generate_worker_batch(
+        items: list[tuple[str, str, str, str]]
+    ) -> tuple[list[PageResult], Optional[dict[str, list[float]]]]:
+    results = generate_page_batch(items)
+    profiler = profiling.active()
+
+    return results, None if profiler is None else profiler.take_stages()
+
+
+def generate_pages(
+        items: list[tuple[str, str, str, str]],
+        jobs: int = 1,
+        mp_context: Optional[BaseContext] = None
+    ) -> list[PageResult]:
+    created = make_dirs(dest_path for _, _, dest_path, _ in items)
+    if created > 0:
+        BUILD_COUNTERS["output directories created"] += created
+
+    profiler = profiling.active()
+
+    if jobs <= 1 or len(items) <= 1:
+        results = generate_page_batch(items)
+    else:
+        size = max(1, len(items) // (jobs * 4))
+        batches = [items[start:start + size] for start in range(0, len(items), size)]
+        templates = load_templates(
+            (template_path, basepath, minify.active() is not None) for _, template_path, _, basepath in items
+        )
+        initargs = (
+            profiler is not None,
+            blockcache.SETTINGS,
+            siteindex.active(),
+            images.active(),
+            minify.SETTINGS,
+            fingerprint.active(),
+            templates
+        )
+
+        with ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=mp_context,
+                initializer=init_worker,
+                initargs=initargs
+            ) as executor:
+            results = []
+
+            for batch, stages in executor.map(generate_worker_batch, batches):
+                results.extend(batch)
+                if profiler is not None and stages is not None:
+                    profiler.merge_stages(stages)
+
+    for result in results:
+        BUILD_COUNTERS.update(result.counters)
+
+        if profiler is not None and result.profile is not None:
+            profiler.add_page(result.dest_path, result.profile)
+
+    return results
+
+
+def page_dependencies(
+        manifest: BuildManifest,
+        from_path: str,
+        template_path: str,
+        dest_path: str,
+        basepath: str,
+        root_dir: str
+    ) -> dict[str, str]:
+    dependencies = manifest.page_dependencies(from_path, template_path, basepath)
+
+    if minify.active() is not None:
+        dependencies["minify"] = "html"
+
+    if images.active() is not None:
+        dependencies["images"] = images.settings()
+
+    if fingerprint.active() is not None:
+        dependencies["fingerprint"] = "assets"
+
+    if images.active() is not None or fingerprint.active() is not None:
+        dependencies["assets_hash"] = manifest.reference_hash(
+            page_asset_urls(manifest.references.get(dest_path, []), template_path),
+            root_dir
+        )
+
+    return dependencies
+
+
+def page_asset_urls(references: list[str], template_path: str) -> list[str]:
+    if fingerprint.active() is None:
+        return references
+    return references + template_urls(template_path)
+
+
+def record_page(
+        manifest: BuildManifest,
+        dest_path: str,
+        dependencies: dict[str, str],
+        info: PageInfo,
+        root_dir: str
+    ) -> None:
+    if "assets_hash" in dependencies:
+        dependencies["assets_hash"] = manifest.reference_hash(
+            page_asset_urls(info.references, dependencies["template"]),
+            root_dir
+        )
+
+    manifest.record(
+        dest_path,
+        dependencies,
+        info.references,
+        info.title,
+        None if info.terms is None else sorted(info.terms)
+    )
+
+
+def generate_pages_recursively(
+        from_dir: str,
+        template_path: str,
+        to_dir: str,
+        basepath: str,
+        manifest: Optional[BuildManifest] = None,
+        jobs: int = 1,
+        pages: Optional[list[tuple[str, str, str]]] = None,
+        changed: Optional[list[str]] = None,
+        mp_context: Optional[BaseContext] = None
+    ) -> set[str]:
+    clear_template_cache()
+
+    if pages is None:
+        pages = walk_pages(from_dir, to_dir, template_path)
+
+    items: list[tuple[str, str, str, str]] = []
+    dependencies: dict[str, dict[str, str]] = {}
+
+    for from_path, template_path, dest_path in pages:
+        if manifest is not None:
+            dependencies[dest_path] = page_dependencies(manifest, from_path, template_path, dest_path, basepath, to_dir)
+
+            if manifest.is_fresh(dest_path, dependencies[dest_path]) and (
+                not siteindex.active() or dest_path in manifest.terms
+            ):
+                continue
+
+        items.append((from_path, template_path, dest_path, basepath))
+
+    for result in generate_pages(items, jobs, mp_context):
+        if manifest is not None:
+            record_page(manifest, result.dest_path, dependencies[result.dest_path], result.info, to_dir)
+        if changed is not None and result.changed:
+            changed.append(result.dest_path)
+
+    return { dest_path for _, _, dest_path in pages }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="main.sh")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="ignore the build manifest, re-render every page and remove untracked output files"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages"
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hard-link static files into the output directory instead of copying them"
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content when their size matches but mtime differs"
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="reuse rendered HTML of unchanged blocks from previous builds"
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=256,
+        help="maximum size of the block cache in megabytes"
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="add width, height, srcset and lazy loading to images and write resized variants (needs Pillow)"
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse template whitespace in pages and minify static CSS"
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="add content hashes to static file names and rewrite references to them"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br with the brotli package) sidecars next to changed text outputs"
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(1, 10),
+        default=9,
+        help="compression level used for the sidecars"
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=1024,
+        help="smallest output size in bytes that gets compressed sidecars"
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute site URL, e.g. https://example.com; enables sitemap.xml and the blog RSS feed"
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write a JSON search index of page titles and words to search.json"
+    )
+    parser.add_argument(
+        "--explain",
+        action="append",
+        metavar="PATH",
+        help="list the pages of the last build that depend on PATH and exit"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record time spent per pipeline stage and per page"
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=PROFILE_PATH,
+        help="where to write the JSON profiling report"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages to print"
+    )
+
+    return parser.parse_args(argv)
+
+
+def remove_image_variants(manifest: BuildManifest, keep: dict[str, str]) -> list[str]:
+    removed: list[str] = []
+
+    for dest_path, path in list(manifest.assets.items()):
+        if is_under(path, IMAGE_CACHE_DIR) and dest_path not in keep:
+            del manifest.assets[dest_path]
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                removed.append(dest_path)
+
+    return removed
+
+
+def process_images(manifest: BuildManifest) -> ImageReport:
+    report = ImagePipeline(IMAGE_CACHE_DIR).process(STATIC_PATH_DIR, PUBLIC_PATH_DIR, fingerprint.active() is not None)
+
+    report.removed = remove_image_variants(manifest, report.variants)
+    manifest.assets.update(report.variants)
+    images.enable(report.images)
+    print(report.summary())
+
+    return report
+
+
+def compress_outputs(
+        manifest: BuildManifest,
+        outputs: set[str],
+        changed: list[str],
+        removed: list[str],
+        full: bool
+    ) -> set[str]:
+    settings = compress.active()
+
+    if settings is None:
+        stale = outputs if "compress" in manifest.settings else changed
+        manifest.settings.pop("compress", None)
+
+        for path in sorted(set(stale)):
+            removed.extend(compress.remove_sidecars(path))
+        return set()
+
+    recorded = { "level": settings.level, "min_size": settings.min_size }
+    force = full or manifest.settings.get("compress") != recorded
+    manifest.settings["compress"] = recorded
+
+    report = compress.compress_outputs(outputs, changed, settings, os.cpu_count() or 1, force)
+    changed.extend(report.written)
+    removed.extend(report.removed)
+    print(report.summary())
+
+    return report.sidecars
+
+
+def fingerprint_static_files(
+        manifest: BuildManifest,
+        fingerprints: Optional[Fingerprints],
+        changed: list[str],
+        removed: list[str]
+    ) -> set[str]:
+    if fingerprints is None:
+        fingerprint.enable(None)
+        if os.path.isfile(ASSET_MANIFEST_PATH):
+            os.remove(ASSET_MANIFEST_PATH)
+            removed.append(ASSET_MANIFEST_PATH)
+        return set()
+
+    fingerprints.save()
+    urls = asset_urls(manifest.assets, STATIC_PATH_DIR, PUBLIC_PATH_DIR)
+
+    fingerprint.enable(urls)
+
+    make_dirs([ASSET_MANIFEST_PATH])
+    if write_asset_manifest(ASSET_MANIFEST_PATH, urls):
+        changed.append(ASSET_MANIFEST_PATH)
+
+    return { ASSET_MANIFEST_PATH }
+
+
+def is_blog_post(from_path: str) -> bool:
+    from_path = os.path.normpath(from_path)
+    blog_dir = os.path.normpath(BLOG_PATH_DIR)
+
+    return from_path.startswith(blog_dir + os.sep) and from_path != os.path.join(blog_dir, "index.md")
+
+
+def write_site_indexes(
+        manifest: BuildManifest,
+        basepath: str,
+        site_url: Optional[str],
+        changed: list[str],
+        removed: list[str]
+    ) -> set[str]:
+    pages = sorted(manifest.entries)
+    written: dict[str, bool] = {}
+
+    if site_url is not None:
+        written[SITEMAP_PATH] = write_sitemap(
+            SITEMAP_PATH,
+            (absolute_url(site_url, page_url(dest_path, PUBLIC_PATH_DIR, basepath)) for dest_path in pages)
+        )
+
+        posts = [dest_path for dest_path in pages if is_blog_post(manifest.entries[dest_path]["source"])]
+
+        if len(posts) > 0:
+            make_dirs([FEED_PATH])
+            written[FEED_PATH] = write_feed(
+                FEED_PATH,
+                manifest.titles.get(os.path.join(PUBLIC_PATH_DIR, "index.html"), "Blog"),
+                absolute_url(site_url, basepath),
+                [
+                    (manifest.titles.get(dest_path, ""), absolute_url(site_url, page_url(dest_path, PUBLIC_PATH_DIR, basepath)))
+                    for dest_path in posts
+                ]
             )
 
+    if siteindex.active():
+        written[SEARCH_INDEX_PATH] = write_search_index(SEARCH_INDEX_PATH, [
+            (page_url(dest_path, PUBLIC_PATH_DIR, basepath), manifest.titles.get(dest_path, ""), manifest.terms.get(dest_path, []))
+            for dest_path in pages
+        ])
+
+    changed.extend(path for path, was_changed in written.items() if was_changed)
+
+    for path in (SITEMAP_PATH, FEED_PATH, SEARCH_INDEX_PATH):
+        if path not in written and os.path.isfile(path):
+            os.remove(path)
+            removed.append(path)
+            prune_empty_dirs(os.path.split(path)[0], PUBLIC_PATH_DIR)
+
+    return set(written)
+
+
+def build(
+        basepath: str = "/",
+        full: bool = False,
+        jobs: int = 1,
+        link_static: bool = False,
+        checksum: bool = False,
+        site_url: Optional[str] = None,
+        image_stage: bool = False,
+        fingerprint_assets: bool = False
+    ) -> BuildManifest:
+    BUILD_COUNTERS.clear()
+
+    manifest = BuildManifest(MANIFEST_PATH)
+    if full:
+        manifest.clear()
+    else:
+        manifest.load()
+
+    profiler = profiling.active()
+    fingerprints = Fingerprints(FINGERPRINT_INDEX_PATH) if fingerprint_assets else None
+
+    if profiler is None:
+        report = copy_static_files(manifest, link_static, checksum, fingerprints)
+    else:
+        with profiler.measure("static"):
+            report = copy_static_files(manifest, link_static, checksum, fingerprints)
+
+    changed = report.copied + report.linked
+    removed = list(report.removed)
+    asset_outputs = fingerprint_static_files(manifest, fingerprints, changed, removed)
+
+    if image_stage:
+        image_report = process_images(manifest)
+        changed.extend(image_report.written)
+        removed.extend(image_report.removed)
+    else:
+        images.enable(None)
+        removed.extend(remove_image_variants(manifest, {}))
+
+    minifier = minify.active()
+    if minifier is not None:
+        changed.extend(minify_static_files(manifest))
+        BUILD_COUNTERS.update(minifier.take_counters())
+    dest_paths = generate_pages_recursively(
+        CONTENT_PATH_DIR,
+        TEMPLATE_PATH,
+        PUBLIC_PATH_DIR,
+        basepath,
+        manifest,
+        jobs,
+        changed=changed
+    )
+
+    for dest_path in manifest.remove_stale(dest_paths, PUBLIC_PATH_DIR):
+        print(f"Removed stale page {dest_path}")
+        removed.append(dest_path)
+
+    site_indexes = write_site_indexes(manifest, basepath, site_url, changed, removed)
+
+    for dest_path in list(removed):
+        removed.extend(compress.remove_sidecars(dest_path))
+
+    outputs = dest_paths | set(manifest.assets) | asset_outputs | site_indexes
+
+    if profiler is None:
+        outputs |= compress_outputs(manifest, outputs, changed, removed, full)
+    else:
+        with profiler.measure("compress"):
+            outputs |= compress_outputs(manifest, outputs, changed, removed, full)
+
+    if full:
+        for path in remove_untracked(PUBLIC_PATH_DIR, outputs):
+            print(f"Removed untracked file {path}")
+            removed.append(path)
+
+    for dest_path, url in manifest.broken_references(PUBLIC_PATH_DIR):
+        print(f"Broken link in {dest_path}: {url}")
+
+    manifest.save()
+
+    with open(CHANGED_PATH, "w") as file:
+        file.writelines(f"{path}\n" for path in sorted(changed))
+    print(f"{len(changed)} output files changed, listed in {CHANGED_PATH}")
+
+    with open(REMOVED_PATH, "w") as file:
+        file.writelines(f"{path}\n" for path in sorted(removed))
+    print(f"{len(removed)} output files removed, listed in {REMOVED_PATH}")
+
+    if len(BUILD_COUNTERS) > 0:
+        print(format_counters(BUILD_COUNTERS))
+
+    return manifest
+
+
+def explain(paths: list[str]) -> None:
+    manifest = BuildManifest(MANIFEST_PATH)
+    manifest.load()
+
+    if len(manifest.entries) == 0:
+        print(f"No build manifest at {MANIFEST_PATH}, run a build first")
+        return
+
+    for path in paths:
+        pages = manifest.dependents(path, PUBLIC_PATH_DIR, template_urls)
+        print(f"{path}: {len(pages)} dependent pages")
+
+        for dest_path, reason in pages:
+            print(f"  {dest_path} ({reason})")
+
 
 def main():
-    basepath = "/"
-    
-    if len(sys.argv) > 2:
-        print("Too many arguments passed. Usage: ./main.sh [basepath=/]")
-        sys.exit(1)
-    elif len(sys.argv) == 2:
-        basepath = sys.argv[1]
-
-    copy_static_files()
-    generate_pages_recursively(CONTENT_PATH_DIR, TEMPLATE_PATH, PUBLIC_PATH_DIR, basepath)
+    args = parse_args(sys.argv[1:])
+
+    if args.explain is not None:
+        explain(args.explain)
+        return
+
+    if args.profile:
+        enable_profiling()
+    if args.search_index:
+        siteindex.enable()
+    if args.minify:
+        minify.enable(MINIFY_CACHE_DIR)
+    if args.compress:
+        compress.enable(args.compress_level, args.compress_min_size)
+    if args.block_cache:
+        blockcache.enable(BLOCK_CACHE_PATH, blockcache.renderer_version(RENDERER_SOURCES))
+
+    build(
+        args.basepath,
+        args.full,
+        args.jobs,
+        args.link_static,
+        args.checksum,
+        args.site_url,
+        args.images,
+        args.fingerprint
+    )
+
+    cache = blockcache.active()
+    if cache is not None:
+        evicted = cache.evict(args.block_cache_size * 1024 * 1024)
+        if evicted > 0:
+            print(f"Evicted {evicted} blocks from the block cache")
+        cache.close()
+
+    profiler = profiling.active()
+    if profiler is not None:
+        print(profiler.format_report(args.profile_top))
+        profiler.write_json(args.profile_output)
+        print(f"Profiling report written to {args.profile_output}")
 
 
 if __name__ == "__main__":
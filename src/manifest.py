@@ -0,0 +1,243 @@
+from typing import Any, Callable, Optional
+import hashlib
+import json
+import os
+
+
+MANIFEST_VERSION = 3
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class BuildManifest():
+    path: str
+    entries: dict[str, dict[str, str]]
+    assets: dict[str, str]
+    references: dict[str, list[str]]
+    titles: dict[str, str]
+    terms: dict[str, list[str]]
+    settings: dict[str, Any]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries = {}
+        self.assets = {}
+        self.references = {}
+        self.titles = {}
+        self.terms = {}
+        self.settings = {}
+        self._hashes: dict[str, str] = {}
+
+    def load(self) -> None:
+        self.clear()
+
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("outputs", {})
+            self.assets = data.get("assets", {})
+            self.references = data.get("references", {})
+            self.titles = data.get("titles", {})
+            self.terms = data.get("terms", {})
+            self.settings = data.get("settings", {})
+
+    def save(self) -> None:
+        directory = os.path.split(self.path)[0]
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        data = json.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "outputs": self.entries,
+                "assets": self.assets,
+                "references": self.references,
+                "titles": self.titles,
+                "terms": self.terms,
+                "settings": self.settings,
+            },
+            separators=(",", ":"),
+            sort_keys=True
+        )
+
+        with open(self.path, "w") as file:
+            file.write(data)
+
+    def clear(self) -> None:
+        self.entries = {}
+        self.assets = {}
+        self.references = {}
+        self.titles = {}
+        self.terms = {}
+        self.settings = {}
+        self._hashes = {}
+
+    def hash_file(self, path: str) -> str:
+        if path not in self._hashes:
+            self._hashes[path] = hash_file(path)
+        return self._hashes[path]
+
+    def invalidate(self, path: str) -> None:
+        self._hashes.pop(path, None)
+
+    def forget(self, dest_path: str) -> None:
+        self.entries.pop(dest_path, None)
+        self.references.pop(dest_path, None)
+        self.titles.pop(dest_path, None)
+        self.terms.pop(dest_path, None)
+
+    def page_dependencies(self, from_path: str, template_path: str, basepath: str) -> dict[str, str]:
+        return {
+            "source": from_path,
+            "template": template_path,
+            "source_hash": hash_file(from_path),
+            "template_hash": self.hash_file(template_path),
+            "basepath_hash": hash_bytes(basepath.encode()),
+        }
+
+    def is_fresh(self, dest_path: str, dependencies: dict[str, str]) -> bool:
+        return self.entries.get(dest_path) == dependencies and os.path.isfile(dest_path)
+
+    def record(
+            self,
+            dest_path: str,
+            dependencies: dict[str, str],
+            references: Optional[list[str]] = None,
+            title: Optional[str] = None,
+            terms: Optional[list[str]] = None
+        ) -> None:
+        self.entries[dest_path] = dependencies
+
+        if references is not None:
+            self.references[dest_path] = sorted(set(references))
+        if title is not None:
+            self.titles[dest_path] = title
+        if terms is not None:
+            self.terms[dest_path] = terms
+
+    def produced(self) -> dict[str, str]:
+        produced: dict[str, str] = {}
+
+        for dest_path, from_path in self.assets.items():
+            produced[os.path.normpath(dest_path)] = from_path
+            produced.setdefault(
+                os.path.normpath(os.path.join(os.path.split(dest_path)[0], os.path.split(from_path)[1])),
+                from_path
+            )
+
+        return produced
+
+    def dependents(
+            self,
+            path: str,
+            root_dir: str,
+            template_urls: Optional[Callable[[str], list[str]]] = None
+        ) -> list[tuple[str, str]]:
+        path = os.path.normpath(path)
+        produced = { dest_path: os.path.normpath(from_path) for dest_path, from_path in self.produced().items() }
+        pages: list[tuple[str, str]] = []
+
+        for dest_path, dependencies in sorted(self.entries.items()):
+            if os.path.normpath(dependencies["source"]) == path:
+                pages.append((dest_path, "source"))
+            elif os.path.normpath(dependencies["template"]) == path:
+                pages.append((dest_path, "template"))
+            else:
+                urls = self.references.get(dest_path, [])
+
+                if template_urls is not None and "fingerprint" in dependencies and os.path.isfile(dependencies["template"]):
+                    urls = urls + template_urls(dependencies["template"])
+
+                for url in urls:
+                    if any(produced.get(target) == path for target in reference_targets(url, root_dir)):
+                        pages.append((dest_path, url))
+                        break
+
+        return pages
+
+    def reference_hash(self, urls: list[str], root_dir: str) -> str:
+        produced = self.produced()
+        digest = hashlib.sha256()
+
+        for url in sorted(urls):
+            for target in reference_targets(url, root_dir):
+                if target in produced:
+                    digest.update(f"{url}\0{self.hash_file(produced[target])}\0".encode())
+                    break
+
+        return digest.hexdigest()
+
+    def broken_references(self, root_dir: str) -> list[tuple[str, str]]:
+        outputs = { os.path.normpath(dest_path) for dest_path in [*self.entries, *self.produced()] }
+        broken: list[tuple[str, str]] = []
+
+        for dest_path, urls in sorted(self.references.items()):
+            for url in urls:
+                if not url.startswith("/") or url.startswith("//"):
+                    continue
+                if not any(target in outputs for target in reference_targets(url, root_dir)):
+                    broken.append((dest_path, url))
+
+        return broken
+
+    def remove_stale(self, dest_paths: set[str], root_dir: str) -> list[str]:
+        removed: list[str] = []
+
+        for dest_path in sorted(set(self.entries) - dest_paths):
+            self.forget(dest_path)
+
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                removed.append(dest_path)
+                prune_empty_dirs(os.path.split(dest_path)[0], root_dir)
+
+        return removed
+
+
+def reference_targets(url: str, root_dir: str) -> list[str]:
+    path = url.split("#", maxsplit=1)[0].split("?", maxsplit=1)[0]
+    dest_path = os.path.normpath(os.path.join(root_dir, path.lstrip("/")))
+
+    return [dest_path, f"{dest_path}.html", os.path.join(dest_path, "index.html")]
+
+
+def remove_untracked(root_dir: str, outputs: set[str]) -> list[str]:
+    outputs = { os.path.normpath(path) for path in outputs }
+    removed: list[str] = []
+
+    for directory, _, filenames in os.walk(root_dir, topdown=False):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+
+            if os.path.normpath(path) not in outputs:
+                os.remove(path)
+                removed.append(path)
+
+        prune_empty_dirs(directory, root_dir)
+
+    return sorted(removed)
+
+
+def prune_empty_dirs(directory: str, root_dir: str) -> None:
+    root_dir = os.path.abspath(root_dir)
+    directory = os.path.abspath(directory)
+
+    while directory != root_dir and directory.startswith(root_dir) and os.path.isdir(directory):
+        if len(os.listdir(directory)) > 0:
+            return
+        os.rmdir(directory)
+        directory = os.path.split(directory)[0]
@@ -0,0 +1,124 @@
+from typing import Optional
+from collections import Counter
+import os
+import re
+from manifest import hash_bytes
+from output import write_output
+
+
+PRESERVED_HTML_PATTERN = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+HTML_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+HTML_LAYOUT_WHITESPACE_PATTERN = re.compile(r">\s*\n\s*<")
+HTML_LEADING_WHITESPACE_PATTERN = re.compile(r"^\s*\n\s*(?=<)")
+HTML_TRAILING_WHITESPACE_PATTERN = re.compile(r"(?<=>)\s*\n\s*$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+CSS_TOKEN_PATTERN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.DOTALL)
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+CSS_COLON_PATTERN = re.compile(r":\s+")
+
+
+def minify_html(html: str) -> str:
+    parts = PRESERVED_HTML_PATTERN.split(html)
+    minified: list[str] = []
+
+    for i in range(0, len(parts), 3):
+        text = HTML_COMMENT_PATTERN.sub("", parts[i])
+        text = HTML_LAYOUT_WHITESPACE_PATTERN.sub("><", text)
+
+        if i > 0:
+            text = HTML_LEADING_WHITESPACE_PATTERN.sub("", text)
+        if i + 1 < len(parts):
+            text = HTML_TRAILING_WHITESPACE_PATTERN.sub("", text)
+
+        minified.append(WHITESPACE_PATTERN.sub(" ", text))
+
+        if i + 1 < len(parts):
+            minified.append(parts[i + 1])
+
+    return "".join(minified)
+
+
+def minify_css(css: str) -> str:
+    parts: list[str] = []
+    position = 0
+
+    for token in CSS_TOKEN_PATTERN.finditer(css):
+        parts.append(minify_css_code(css[position:token.start()]))
+        if token[1] is not None:
+            parts.append(token[1])
+        position = token.end()
+
+    parts.append(minify_css_code(css[position:]))
+
+    return "".join(parts).strip()
+
+
+def minify_css_code(code: str) -> str:
+    code = WHITESPACE_PATTERN.sub(" ", code)
+    code = CSS_PUNCTUATION_PATTERN.sub(r"\1", code)
+    code = CSS_COLON_PATTERN.sub(":", code)
+    return code.replace(";}", "}")
+
+
+MINIFIERS = {
+    "html": minify_html,
+    "css": minify_css,
+}
+
+
+class MinifyCache():
+    directory: str
+    counters: Counter[str]
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.counters = Counter()
+        self.memory: dict[str, str] = {}
+
+    def minify(self, kind: str, text: str) -> str:
+        key = f"{kind}-{hash_bytes(text.encode())}"
+
+        if key in self.memory:
+            return self.memory[key]
+
+        path = os.path.join(self.directory, key)
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                minified = file.read()
+            self.counters["minify cache hits"] += 1
+        except OSError:
+            minified = MINIFIERS[kind](text)
+            os.makedirs(self.directory, exist_ok=True)
+            write_output(path, minified)
+            self.counters["minify cache misses"] += 1
+
+        self.memory[key] = minified
+        return minified
+
+    def take_counters(self) -> Counter[str]:
+        counters = self.counters
+        self.counters = Counter()
+        return counters
+
+
+SETTINGS: Optional[str] = None
+CACHE: Optional[MinifyCache] = None
+
+
+def enable(directory: str) -> None:
+    global SETTINGS
+    SETTINGS = directory
+
+
+def active() -> Optional[MinifyCache]:
+    global CACHE
+
+    if SETTINGS is None:
+        return None
+
+    if CACHE is None or CACHE.directory != SETTINGS:
+        CACHE = MinifyCache(SETTINGS)
+
+    return CACHE
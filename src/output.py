@@ -0,0 +1,96 @@
+from typing import Optional, TextIO
+import os
+
+
+TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def same_contents(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as file:
+            return file.read() == data
+    except OSError:
+        return False
+
+
+def same_files(path: str, other_path: str) -> bool:
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+        with open(path, "rb") as file, open(other_path, "rb") as other:
+            while True:
+                chunk = file.read(1024 * 1024)
+                if chunk != other.read(1024 * 1024):
+                    return False
+                if chunk == b"":
+                    return True
+    except OSError:
+        return False
+
+
+def temp_path(path: str) -> tuple[int, str]:
+    directory, filename = os.path.split(path)
+
+    while True:
+        temp = os.path.join(directory, f".{filename}.{os.urandom(4).hex()}.tmp")
+        try:
+            fd = os.open(temp, TEMP_FLAGS, 0o666)
+        except FileExistsError:
+            continue
+
+        try:
+            os.fchmod(fd, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+
+        return fd, temp
+
+
+def write_output(path: str, contents: str | bytes) -> bool:
+    data = contents.encode() if isinstance(contents, str) else contents
+
+    if same_contents(path, data):
+        return False
+
+    fd, temp = temp_path(path)
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+    return True
+
+
+class AtomicOutput():
+    path: str
+    changed: bool
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.changed = False
+        self.temp: Optional[str] = None
+        self.file: Optional[TextIO] = None
+
+    def __enter__(self) -> TextIO:
+        fd, self.temp = temp_path(self.path)
+        self.file = os.fdopen(fd, "w", encoding="utf-8")
+        return self.file
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if self.file is None or self.temp is None:
+            return
+
+        self.file.close()
+
+        if exc_type is None and not same_files(self.temp, self.path):
+            os.replace(self.temp, self.path)
+            self.changed = True
+        else:
+            os.remove(self.temp)
@@ -0,0 +1,94 @@
+from typing import Callable, Iterable, Iterator, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+from output import write_output
+
+
+def make_dirs(paths: Iterable[str]) -> int:
+    created = 0
+
+    for directory in sorted({ os.path.split(path)[0] for path in paths }):
+        if directory != "" and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            created += 1
+
+    return created
+
+
+class ReadAhead():
+    paths: list[str]
+    depth: int
+
+    def __init__(self, paths: list[str], read: Callable[[str], Optional[str]], depth: int, threads: int) -> None:
+        self.paths = paths
+        self.read = read
+        self.depth = max(1, depth)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, threads))
+        self.pending: deque[Future[Optional[str]]] = deque()
+
+    def __iter__(self) -> Iterator[tuple[str, Optional[str]]]:
+        submitted = 0
+
+        for path in self.paths:
+            while submitted < len(self.paths) and len(self.pending) < self.depth:
+                self.pending.append(self.executor.submit(self.read, self.paths[submitted]))
+                submitted += 1
+
+            yield path, self.pending.popleft().result()
+
+    def close(self) -> None:
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ReadAhead":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class WriteBehind():
+    depth: int
+    written: int
+    changed: list[str]
+
+    def __init__(self, depth: int, threads: int) -> None:
+        self.depth = max(1, depth)
+        self.written = 0
+        self.changed = []
+        self.executor = ThreadPoolExecutor(max_workers=max(1, threads))
+        self.pending: deque[tuple[str, Future[bool]]] = deque()
+
+    def write(self, path: str, contents: str) -> None:
+        while len(self.pending) >= self.depth:
+            self.complete()
+
+        self.pending.append((path, self.executor.submit(write_output, path, contents)))
+        self.written += 1
+
+    def complete(self) -> None:
+        path, future = self.pending.popleft()
+        if future.result():
+            self.changed.append(path)
+
+    def flush(self) -> None:
+        while len(self.pending) > 0:
+            self.complete()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown()
+
+    def __enter__(self) -> "WriteBehind":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,151 @@
+from typing import Any, Callable, Iterator, Optional
+from contextlib import contextmanager
+from functools import wraps
+import json
+import os
+import threading
+import time
+
+
+class Profiler():
+    stages: dict[str, list[float]]
+    pages: dict[str, dict[str, list[float]]]
+
+    def __init__(self) -> None:
+        self.stages = {}
+        self.pages = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    @property
+    def page(self) -> Optional[dict[str, list[float]]]:
+        return getattr(self.local, "page", None)
+
+    @page.setter
+    def page(self, page: Optional[dict[str, list[float]]]) -> None:
+        self.local.page = page
+
+    def record(self, stage: str, seconds: float, calls: int = 1) -> None:
+        page = self.page
+        if page is not None:
+            totals = page.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+            return
+
+        with self.lock:
+            totals = self.stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def instrument(self, namespace: dict[str, Any], names: list[str]) -> None:
+        for name in names:
+            function = namespace[name]
+            if getattr(function, "__profiled__", None) is self:
+                continue
+            if getattr(function, "__profiled__", None) is not None:
+                function = function.__wrapped__
+            namespace[name] = self.wrap(function, name)
+
+    def wrap(self, function: Callable, stage: str) -> Callable:
+        @wraps(function)
+        def profiled(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        setattr(profiled, "__profiled__", self)
+        return profiled
+
+    def begin_page(self) -> None:
+        self.page = { "total": [time.perf_counter(), 1] }
+
+    def end_page(self) -> dict[str, list[float]]:
+        if self.page is None:
+            raise Exception("no page is being profiled")
+
+        page = self.page
+        page["total"][0] = time.perf_counter() - page["total"][0]
+        self.page = None
+
+        return page
+
+    def add_page(self, path: str, page: dict[str, list[float]]) -> None:
+        self.pages[path] = page
+        self.merge_stages({ stage: totals for stage, totals in page.items() if stage != "total" })
+
+    def merge_stages(self, stages: dict[str, list[float]]) -> None:
+        with self.lock:
+            for stage, (seconds, calls) in stages.items():
+                totals = self.stages.setdefault(stage, [0.0, 0])
+                totals[0] += seconds
+                totals[1] += calls
+
+    def take_stages(self) -> dict[str, list[float]]:
+        with self.lock:
+            stages = self.stages
+            self.stages = {}
+
+        return stages
+
+    def slowest_pages(self, top: int) -> list[tuple[str, dict[str, list[float]]]]:
+        return sorted(self.pages.items(), key=lambda item: item[1]["total"][0], reverse=True)[:top]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stages": {
+                stage: { "seconds": seconds, "calls": calls }
+                for stage, (seconds, calls) in sorted(self.stages.items())
+            },
+            "pages": {
+                path: {
+                    stage: { "seconds": seconds, "calls": calls }
+                    for stage, (seconds, calls) in sorted(page.items())
+                }
+                for path, page in sorted(self.pages.items())
+            },
+        }
+
+    def write_json(self, path: str) -> None:
+        directory = os.path.split(path)[0]
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=1)
+
+    def format_report(self, top: int = 10) -> str:
+        lines = [f"{'stage':<28}{'calls':>10}{'seconds':>12}"]
+        for stage, (seconds, calls) in sorted(self.stages.items(), key=lambda item: item[1][0], reverse=True):
+            lines.append(f"{stage:<28}{int(calls):>10}{seconds:>12.4f}")
+
+        lines.append("")
+        lines.append(f"{'slowest pages':<60}{'ms':>10}")
+        for path, page in self.slowest_pages(top):
+            lines.append(f"{path:<60}{page['total'][0] * 1000:>10.2f}")
+
+        return "\n".join(lines)
+
+
+PROFILER: Optional[Profiler] = None
+
+
+def enable() -> Profiler:
+    global PROFILER
+    if PROFILER is None:
+        PROFILER = Profiler()
+    return PROFILER
+
+
+def active() -> Optional[Profiler]:
+    return PROFILER
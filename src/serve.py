@@ -0,0 +1,309 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from manifest import BuildManifest, prune_empty_dirs
+from sync import is_under, sync_file
+from main import (
+    STATIC_PATH_DIR,
+    CONTENT_PATH_DIR,
+    PUBLIC_PATH_DIR,
+    TEMPLATE_PATH,
+    TEMPLATE_FILENAME,
+    MINIFY_CACHE_DIR,
+    PageInfo,
+    build,
+    content_dest_path,
+    generate_page,
+    generate_pages_recursively,
+    is_minified_asset,
+    minify_static_file,
+    page_dependencies,
+    page_template_path,
+    process_images,
+    record_page
+)
+import compress
+import images
+import minify
+from pipeline import make_dirs
+import siteindex
+
+
+POLL_SCAN_FACTOR = 4
+WORKER_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    files: dict[str, tuple[int, int]] = {}
+
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+        elif os.path.isdir(path):
+            scan_directory(path, files)
+
+    return files
+
+
+def scan_directory(directory: str, files: dict[str, tuple[int, int]]) -> None:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                scan_directory(entry.path, files)
+            elif entry.is_file():
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def diff_snapshots(
+        old: dict[str, tuple[int, int]],
+        new: dict[str, tuple[int, int]]
+    ) -> tuple[set[str], set[str]]:
+    changed = { path for path, stat in new.items() if old.get(path) != stat }
+    removed = set(old) - set(new)
+    return changed, removed
+
+
+class Watcher():
+    basepath: str
+    jobs: int
+    manifest: BuildManifest
+    files: dict[str, tuple[int, int]]
+    written: list[str]
+    unsaved: bool
+    scan_seconds: float
+
+    def __init__(self, basepath: str, jobs: int, manifest: BuildManifest) -> None:
+        self.basepath = basepath
+        self.jobs = jobs
+        self.manifest = manifest
+        self.written = []
+        self.unsaved = False
+
+        start = time.perf_counter()
+        self.files = snapshot(self.watched_paths())
+        self.scan_seconds = time.perf_counter() - start
+
+    def watched_paths(self) -> list[str]:
+        return [CONTENT_PATH_DIR, STATIC_PATH_DIR, TEMPLATE_PATH]
+
+    def pages(self) -> list[tuple[str, str, str]]:
+        return [
+            (path, self.template_path(path), content_dest_path(path, CONTENT_PATH_DIR, PUBLIC_PATH_DIR))
+            for path in sorted(self.files)
+            if is_under(path, CONTENT_PATH_DIR) and path.endswith(".md")
+        ]
+
+    def template_path(self, from_path: str) -> str:
+        return page_template_path(from_path, CONTENT_PATH_DIR, TEMPLATE_PATH, self.files.__contains__)
+
+    def poll(self) -> bool:
+        start = time.perf_counter()
+        files = snapshot(self.watched_paths())
+        self.scan_seconds = time.perf_counter() - start
+
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+
+        if len(changed) == 0 and len(removed) == 0:
+            self.save()
+            return False
+
+        start = time.perf_counter()
+        self.rebuild(changed, removed)
+        print(f"Rebuilt {len(changed) + len(removed)} changed files in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        return True
+
+    def rebuild(self, changed: set[str], removed: set[str]) -> None:
+        for path in changed | removed:
+            self.manifest.invalidate(path)
+
+        templates = { path for path in changed | removed if os.path.split(path)[1] == TEMPLATE_FILENAME }
+
+        if TEMPLATE_PATH in changed or len(templates) > 0:
+            generate_pages_recursively(
+                CONTENT_PATH_DIR,
+                TEMPLATE_PATH,
+                PUBLIC_PATH_DIR,
+                self.basepath,
+                self.manifest,
+                self.jobs,
+                self.pages(),
+                self.written,
+                WORKER_CONTEXT
+            )
+        else:
+            for from_path in sorted(changed):
+                if is_under(from_path, CONTENT_PATH_DIR) and from_path.endswith(".md"):
+                    self.rebuild_page(from_path)
+
+        for path in sorted(changed):
+            if is_under(path, STATIC_PATH_DIR):
+                dest_path = os.path.join(PUBLIC_PATH_DIR, os.path.relpath(path, STATIC_PATH_DIR))
+                if minify.active() is not None and is_minified_asset(path):
+                    make_dirs([dest_path])
+                    minify_static_file(path, dest_path)
+                else:
+                    sync_file(path, dest_path)
+                self.manifest.assets[dest_path] = path
+                self.written.append(dest_path)
+
+        static = [path for path in sorted(changed | removed) if is_under(path, STATIC_PATH_DIR)]
+
+        if images.active() is not None and len(static) > 0:
+            sources = {
+                self.manifest.entries[dest_path]["source"]
+                for path in static
+                for dest_path, _ in self.manifest.dependents(path, PUBLIC_PATH_DIR)
+            }
+
+            self.written.extend(process_images(self.manifest).written)
+
+            for from_path in sorted(sources):
+                if os.path.isfile(from_path):
+                    self.rebuild_page(from_path)
+
+        for path in sorted(removed):
+            if is_under(path, CONTENT_PATH_DIR) and path.endswith(".md"):
+                dest_path = content_dest_path(path, CONTENT_PATH_DIR, PUBLIC_PATH_DIR)
+                self.manifest.forget(dest_path)
+            elif is_under(path, STATIC_PATH_DIR):
+                dest_path = os.path.join(PUBLIC_PATH_DIR, os.path.relpath(path, STATIC_PATH_DIR))
+                self.manifest.assets.pop(dest_path, None)
+            else:
+                continue
+
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                compress.remove_sidecars(dest_path)
+                prune_empty_dirs(os.path.split(dest_path)[0], PUBLIC_PATH_DIR)
+
+        settings = compress.active()
+        if settings is not None:
+            compress.compress_outputs(self.written, self.written, settings, self.jobs)
+        self.written = []
+        self.unsaved = True
+
+    def save(self) -> None:
+        if self.unsaved:
+            self.manifest.save()
+            self.unsaved = False
+
+    def rebuild_page(self, from_path: str) -> None:
+        dest_path = content_dest_path(from_path, CONTENT_PATH_DIR, PUBLIC_PATH_DIR)
+        template_path = self.template_path(from_path)
+        dependencies = page_dependencies(self.manifest, from_path, template_path, dest_path, self.basepath, PUBLIC_PATH_DIR)
+        info = PageInfo(siteindex.active())
+
+        try:
+            generate_page(from_path, template_path, dest_path, self.basepath, info)
+        except Exception as error:
+            print(f"failed to generate page from {from_path}: {error}")
+            return
+
+        record_page(self.manifest, dest_path, dependencies, info, PUBLIC_PATH_DIR)
+        self.written.append(dest_path)
+
+    def run(self, interval: float) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as error:
+                print(f"rebuild failed: {error}")
+            time.sleep(max(interval, self.scan_seconds * POLL_SCAN_FACTOR))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="main.sh")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="rebuild changed pages and static files while serving"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.05,
+        help="minimum seconds between polls of the watched files; large sites poll less often"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes used for full re-renders"
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="add width, height, srcset and lazy loading to images and write resized variants (needs Pillow)"
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse template whitespace in pages and minify static CSS"
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br with the brotli package) sidecars next to changed text outputs"
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(1, 10),
+        default=9,
+        help="compression level used for the sidecars"
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=1024,
+        help="smallest output size in bytes that gets compressed sidecars"
+    )
+
+    return parser.parse_args(argv)
+
+
+def initial_build(args: argparse.Namespace) -> BuildManifest:
+    if args.minify:
+        minify.enable(MINIFY_CACHE_DIR)
+    if args.compress:
+        compress.enable(args.compress_level, args.compress_min_size)
+
+    return build(args.basepath, jobs=args.jobs, image_stage=args.images)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    manifest = initial_build(args)
+
+    handler = partial(SimpleHTTPRequestHandler, directory=PUBLIC_PATH_DIR)
+    server = ThreadingHTTPServer(("", args.port), handler)
+    print(f"Serving {PUBLIC_PATH_DIR} on http://localhost:{args.port}")
+
+    if not args.watch:
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    watcher = Watcher(args.basepath, args.jobs, manifest)
+
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        server.shutdown()
+        watcher.save()
+
+
+if __name__ == "__main__":
+    main()
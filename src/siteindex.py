@@ -0,0 +1,92 @@
+from typing import Iterable
+from xml.sax.saxutils import escape
+import json
+import os
+import re
+from output import AtomicOutput
+
+
+TERM_PATTERN = re.compile(r"\w{2,}")
+
+SEARCH_INDEX = False
+
+
+def enable() -> None:
+    global SEARCH_INDEX
+    SEARCH_INDEX = True
+
+
+def active() -> bool:
+    return SEARCH_INDEX
+
+
+def text_terms(text: str) -> set[str]:
+    return { term.lower() for term in TERM_PATTERN.findall(text) }
+
+
+def page_url(dest_path: str, root_dir: str, basepath: str = "/") -> str:
+    path = os.path.relpath(dest_path, root_dir).replace(os.sep, "/")
+
+    if path == "index.html":
+        path = ""
+    elif path.endswith("/index.html"):
+        path = path.removesuffix("index.html")
+
+    return basepath + path
+
+
+def absolute_url(site_url: str, url: str) -> str:
+    return site_url.rstrip("/") + url
+
+
+def write_sitemap(path: str, urls: Iterable[str]) -> bool:
+    output = AtomicOutput(path)
+
+    with output as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url in urls:
+            file.write(f"<url><loc>{escape(url)}</loc></url>\n")
+        file.write("</urlset>\n")
+
+    return output.changed
+
+
+def write_feed(path: str, title: str, link: str, items: Iterable[tuple[str, str]]) -> bool:
+    output = AtomicOutput(path)
+
+    with output as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write('<rss version="2.0"><channel>\n')
+        file.write(f"<title>{escape(title)}</title><link>{escape(link)}</link><description>{escape(title)}</description>\n")
+        for item_title, url in items:
+            file.write(f"<item><title>{escape(item_title)}</title><link>{escape(url)}</link><guid>{escape(url)}</guid></item>\n")
+        file.write("</channel></rss>\n")
+
+    return output.changed
+
+
+def write_search_index(path: str, documents: list[tuple[str, str, list[str]]]) -> bool:
+    index: dict[str, list[int]] = {}
+
+    for document, (_, _, terms) in enumerate(documents):
+        for term in terms:
+            index.setdefault(term, []).append(document)
+
+    output = AtomicOutput(path)
+
+    with output as file:
+        file.write('{"pages":[')
+        for document, (url, title, _) in enumerate(documents):
+            if document > 0:
+                file.write(",")
+            file.write(json.dumps([url, title], separators=(",", ":")))
+
+        file.write('],"terms":{')
+        for position, term in enumerate(sorted(index)):
+            if position > 0:
+                file.write(",")
+            file.write(f"{json.dumps(term)}:{json.dumps(index[term], separators=(',', ':'))}")
+        file.write("}}\n")
+
+    return output.changed
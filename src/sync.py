@@ -0,0 +1,128 @@
+from typing import Callable, Optional
+import os, shutil
+from manifest import BuildManifest, hash_file, prune_empty_dirs
+
+
+class SyncReport():
+    copied: list[str]
+    linked: list[str]
+    skipped: list[str]
+    removed: list[str]
+    bytes_copied: int
+    bytes_skipped: int
+
+    def __init__(self) -> None:
+        self.copied = []
+        self.linked = []
+        self.skipped = []
+        self.removed = []
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+
+    def summary(self) -> str:
+        return (
+            f"Static files: {len(self.copied)} copied ({self.bytes_copied} bytes), "
+            f"{len(self.linked)} linked, "
+            f"{len(self.skipped)} unchanged ({self.bytes_skipped} bytes skipped), "
+            f"{len(self.removed)} removed"
+        )
+
+
+def is_under(path: str, directory: str) -> bool:
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+
+def is_up_to_date(from_path: str, dest_path: str, checksum: bool = False) -> bool:
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    from_stat = os.stat(from_path)
+
+    if os.path.samestat(from_stat, dest_stat):
+        return True
+    if from_stat.st_size != dest_stat.st_size:
+        return False
+    if from_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+
+    return checksum and hash_file(from_path) == hash_file(dest_path)
+
+
+def sync_file(from_path: str, dest_path: str, link: bool = False) -> bool:
+    directory = os.path.split(dest_path)[0]
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    if link:
+        try:
+            if os.path.lexists(dest_path):
+                os.remove(dest_path)
+            os.link(from_path, dest_path)
+            return True
+        except OSError:
+            pass
+
+    shutil.copy2(from_path, dest_path)
+    return False
+
+
+def collect_files(from_dir: str, to_dir: str) -> list[tuple[str, str]]:
+    files: list[tuple[str, str]] = []
+
+    with os.scandir(from_dir) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                files.extend(collect_files(entry.path, os.path.join(to_dir, entry.name)))
+            elif entry.is_file():
+                files.append((entry.path, os.path.join(to_dir, entry.name)))
+
+    return files
+
+
+def sync_directory(
+        from_dir: str,
+        to_dir: str,
+        manifest: Optional[BuildManifest] = None,
+        link: bool = False,
+        checksum: bool = False,
+        exclude: Optional[Callable[[str], bool]] = None,
+        rename: Optional[Callable[[str, str], str]] = None
+    ) -> SyncReport:
+    report = SyncReport()
+    assets: dict[str, str] = {}
+
+    for from_path, dest_path in collect_files(from_dir, to_dir):
+        if rename is not None:
+            dest_path = rename(from_path, dest_path)
+        assets[dest_path] = from_path
+
+        if exclude is not None and exclude(from_path):
+            continue
+        size = os.path.getsize(from_path)
+
+        if is_up_to_date(from_path, dest_path, checksum):
+            report.skipped.append(dest_path)
+            report.bytes_skipped += size
+        elif sync_file(from_path, dest_path, link):
+            report.linked.append(dest_path)
+            report.bytes_skipped += size
+        else:
+            report.copied.append(dest_path)
+            report.bytes_copied += size
+
+    if manifest is not None:
+        owned = { dest_path for dest_path, path in manifest.assets.items() if is_under(path, from_dir) }
+
+        for dest_path in sorted(owned - set(assets)):
+            del manifest.assets[dest_path]
+
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                report.removed.append(dest_path)
+                prune_empty_dirs(os.path.split(dest_path)[0], to_dir)
+
+        manifest.assets.update(assets)
+
+    return report
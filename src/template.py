@@ -0,0 +1,111 @@
+from functools import cache
+from typing import Callable, Iterable, Optional, TextIO, Union
+import re
+from htmlnode import HTMLNode
+import fingerprint
+import minify
+
+
+SLOT_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href|src)="/([^"]*)"')
+
+SlotValue = Union[str, HTMLNode, Callable[[], Iterable[str]]]
+TemplateKey = tuple[str, str, bool]
+
+
+def rewrite_basepath(html: str, basepath: str) -> str:
+    return URL_ATTRIBUTE_PATTERN.sub(
+        lambda match: f'{match[1]}="{basepath}{fingerprint.lookup("/" + match[2])[1:]}"',
+        html
+    )
+
+
+class Template():
+    segments: list[str]
+    slots: list[str]
+    saved: int
+
+    def __init__(self, source: str, basepath: str = "/", minifier: Optional[minify.MinifyCache] = None) -> None:
+        self.segments = []
+        self.slots = []
+        self.saved = 0
+
+        position = 0
+        for slot in SLOT_PATTERN.finditer(source):
+            self.segments.append(rewrite_basepath(source[position:slot.start()], basepath))
+            self.slots.append(slot[1])
+            position = slot.end()
+
+        self.segments.append(rewrite_basepath(source[position:], basepath))
+
+        if minifier is not None:
+            size = sum(len(segment.encode()) for segment in self.segments)
+            self.segments = [minifier.minify("html", segment) for segment in self.segments]
+            self.segments[0] = self.segments[0].lstrip()
+            self.segments[-1] = self.segments[-1].rstrip()
+            self.saved = size - sum(len(segment.encode()) for segment in self.segments)
+
+    def render(self, values: dict[str, SlotValue]) -> str:
+        parts: list[str] = [self.segments[0]]
+
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+
+            if isinstance(value, str):
+                parts.append(value)
+            elif isinstance(value, HTMLNode):
+                parts.append(value.to_html())
+            else:
+                parts.extend(value())
+
+            parts.append(segment)
+
+        return "".join(parts)
+
+    def write(self, stream: TextIO, values: dict[str, SlotValue]) -> None:
+        stream.write(self.segments[0])
+
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+
+            if isinstance(value, str):
+                stream.write(value)
+            elif isinstance(value, HTMLNode):
+                value.write_html(stream)
+            else:
+                for chunk in value():
+                    stream.write(chunk)
+
+            stream.write(segment)
+
+
+TEMPLATES: dict[TemplateKey, Template] = {}
+
+
+def load_template(path: str, basepath: str, minified: bool = False) -> Template:
+    key = (path, basepath, minified)
+
+    if key not in TEMPLATES:
+        with open(path) as file:
+            TEMPLATES[key] = Template(file.read(), basepath, minify.active() if minified else None)
+
+    return TEMPLATES[key]
+
+
+def load_templates(keys: Iterable[TemplateKey]) -> dict[TemplateKey, Template]:
+    return { key: load_template(*key) for key in sorted(set(keys)) }
+
+
+def preload_templates(templates: dict[TemplateKey, Template]) -> None:
+    TEMPLATES.update(templates)
+
+
+@cache
+def template_urls(path: str) -> list[str]:
+    with open(path) as file:
+        return ["/" + match[2] for match in URL_ATTRIBUTE_PATTERN.finditer(file.read())]
+
+
+def clear_template_cache() -> None:
+    TEMPLATES.clear()
+    template_urls.cache_clear()
@@ -0,0 +1,93 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import unittest
+
+from blockcache import BlockCache
+from fixtures import TempDirTestCase
+
+
+def fill_cache(path, version, worker):
+    cache = BlockCache(path, version)
+    for i in range(20):
+        cache.put(cache.key("paragraph", [f"{worker} {i}"], "/"), "<p></p>")
+    cache.close()
+
+
+class Test_BlockCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "cache", "blocks.sqlite")
+
+    def test_round_trip(self):
+        cache = BlockCache(self.path, "v1")
+        key = cache.key("paragraph", ["Some **text**"], "/")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>Some <b>text</b></p>")
+        cache.close()
+
+        cache = BlockCache(self.path, "v1")
+        self.assertEqual(cache.get(key), ("<p>Some <b>text</b></p>", [], None))
+        self.assertEqual(cache.take_counters()["block cache hits"], 1)
+        cache.close()
+
+    def test_stores_references_and_terms(self):
+        cache = BlockCache(self.path, "v1")
+        key = cache.key("paragraph", ["[Tom](/blog/tom)"], "/", True)
+        cache.put(key, '<p><a href="/blog/tom">Tom</a></p>', ["/blog/tom"], { "tom" })
+        cache.close()
+
+        cache = BlockCache(self.path, "v1")
+        self.assertEqual(cache.get(key), ('<p><a href="/blog/tom">Tom</a></p>', ["/blog/tom"], ["tom"]))
+        cache.close()
+
+    def test_key_depends_on_type_and_basepath(self):
+        cache = BlockCache(self.path, "v1")
+        key = cache.key("paragraph", ["text"], "/")
+
+        self.assertNotEqual(key, cache.key("heading", ["text"], "/"))
+        self.assertNotEqual(key, cache.key("paragraph", ["text"], "/blog/"))
+        self.assertNotEqual(key, cache.key("paragraph", ["te", "xt"], "/"))
+        self.assertNotEqual(key, cache.key("paragraph", ["text"], "/", True))
+        cache.close()
+
+    def test_version_change_invalidates(self):
+        cache = BlockCache(self.path, "v1")
+        key = cache.key("paragraph", ["text"], "/")
+        cache.put(key, "<p>text</p>")
+        cache.close()
+
+        cache = BlockCache(self.path, "v2")
+        self.assertIsNone(cache.get(key))
+        cache.close()
+
+    def test_workers_share_cache_after_version_change(self):
+        fill_cache(self.path, "v1", 0)
+
+        with ProcessPoolExecutor(max_workers=8) as executor:
+            list(executor.map(fill_cache, [self.path] * 8, ["v2"] * 8, range(8)))
+
+        cache = BlockCache(self.path, "v2")
+        self.assertEqual(cache.connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0], 160)
+        cache.close()
+
+    def test_evict_least_recently_used(self):
+        cache = BlockCache(self.path, "v1")
+        keys = [cache.key("paragraph", [str(i)], "/") for i in range(3)]
+
+        for key in keys:
+            cache.put(key, "x" * 100)
+            cache.flush()
+
+        cache.get(keys[0])
+        cache.flush()
+
+        evicted = cache.evict(250)
+
+        self.assertEqual(evicted, 1)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
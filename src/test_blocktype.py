@@ -1,7 +1,8 @@
 import unittest
 from blocktype import (
     BlockType,
-    block_to_blocktype
+    block_to_blocktype,
+    scan_blocks
 )
 
 
@@ -103,6 +104,34 @@ class Test_block_to_blocktype(unittest.TestCase):
         self.assertEqual(actual, expected) 
 
 
+class Test_scan_blocks(unittest.TestCase):
+    def test_blocks_and_types(self):
+        md = "\n\n  # Title\n\nSome text\nmore text  \n\n\n\n- one\n- two\n\n```\ncode\n\n```"
+        expected = [
+            (BlockType.HEADING, ["# Title"]),
+            (BlockType.PARAGRAPH, ["Some text", "more text"]),
+            (BlockType.UNORDERED_LIST, ["- one", "- two"]),
+            (BlockType.PARAGRAPH, ["```", "code"]),
+            (BlockType.CODE, ["```"]),
+        ]
+
+        actual = list(scan_blocks(md))
+
+        self.assertListEqual(actual, expected)
+
+    def test_whitespace_lines_stay_in_block(self):
+        md = "> first\n   \n> second"
+        expected = [(BlockType.PARAGRAPH, ["> first", "   ", "> second"])]
+
+        actual = list(scan_blocks(md))
+
+        self.assertListEqual(actual, expected)
+
+    def test_heading_levels(self):
+        self.assertEqual(block_to_blocktype("####### seven"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_blocktype("## #hash"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_blocktype("#no space"), BlockType.PARAGRAPH)
+
 
 if __name__ == "__main__":
     unittest.main()
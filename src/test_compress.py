@@ -0,0 +1,59 @@
+import gzip
+import os
+import unittest
+
+from compress import CompressSettings, brotli, compress_outputs, encodings
+from fixtures import TempDirTestCase
+
+
+class Test_compress_outputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.settings = CompressSettings(9, 64)
+
+    def test_writes_gzip_sidecars(self):
+        page = self.write("index.html", "<p>Tolkien</p>" * 20)
+        image = self.write("tolkien.png", "not text" * 20)
+
+        report = compress_outputs([page, image], [page], self.settings, 2)
+
+        self.assertIn(page + ".gz", report.written)
+        self.assertSetEqual(report.sidecars, { page + encoding for encoding in encodings() })
+        self.assertFalse(os.path.exists(image + ".gz"))
+        with gzip.open(page + ".gz", "rt") as file:
+            self.assertEqual(file.read(), "<p>Tolkien</p>" * 20)
+
+    def test_skips_unchanged_files(self):
+        page = self.write("index.html", "<p>Tolkien</p>" * 20)
+        compress_outputs([page], [page], self.settings, 1)
+        os.utime(page + ".gz", ns=(0, 0))
+
+        report = compress_outputs([page], [], self.settings, 1)
+
+        self.assertListEqual(report.compressed, [])
+        self.assertEqual(os.stat(page + ".gz").st_mtime_ns, 0)
+        self.assertSetEqual(report.sidecars, { page + encoding for encoding in encodings() })
+
+    def test_removes_sidecars_below_min_size(self):
+        page = self.write("index.html", "<p>Tolkien</p>" * 20)
+        compress_outputs([page], [page], self.settings, 1)
+        self.write("index.html", "<p>Tom</p>")
+
+        report = compress_outputs([page], [page], self.settings, 1)
+
+        self.assertIn(page + ".gz", report.removed)
+        self.assertSetEqual(report.sidecars, set())
+        self.assertFalse(os.path.exists(page + ".gz"))
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_writes_brotli_sidecars(self):
+        page = self.write("index.html", "<p>Tolkien</p>" * 20)
+
+        compress_outputs([page], [page], self.settings, 1)
+
+        with open(page + ".br", "rb") as file:
+            self.assertEqual(brotli.decompress(file.read()).decode(), "<p>Tolkien</p>" * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
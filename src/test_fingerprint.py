@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from fingerprint import Fingerprints, asset_urls, fingerprinted_path
+from fixtures import TempDirTestCase
+
+
+class Test_fingerprinted_path(unittest.TestCase):
+    def test_inserts_digest(self):
+        self.assertEqual(fingerprinted_path("docs/index.css", "3f9a1c2b7d0e"), "docs/index.3f9a1c2b.css")
+
+
+class Test_Fingerprints(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.css")
+        self.index_path = os.path.join(self.root, "build", "fingerprints.json")
+
+        with open(self.path, "w") as file:
+            file.write("body {}")
+
+    def test_rename_follows_contents(self):
+        fingerprints = Fingerprints(self.index_path)
+        first = fingerprints.rename(self.path, "docs/index.css")
+
+        with open(self.path, "w") as file:
+            file.write("body { margin: 0 }")
+
+        self.assertRegex(first, r"^docs/index\.[0-9a-f]{8}\.css$")
+        self.assertNotEqual(fingerprints.rename(self.path, "docs/index.css"), first)
+
+    def test_saved_index_is_reused(self):
+        fingerprints = Fingerprints(self.index_path)
+        name = fingerprints.rename(self.path, "docs/index.css")
+        fingerprints.save()
+
+        fingerprints = Fingerprints(self.index_path)
+        fingerprints.index[self.path][2] = "0" * 64
+
+        self.assertNotEqual(name, "docs/index.00000000.css")
+        self.assertEqual(fingerprints.rename(self.path, "docs/index.css"), "docs/index.00000000.css")
+
+
+class Test_asset_urls(unittest.TestCase):
+    def test_maps_static_urls(self):
+        assets = {
+            os.path.join("docs", "index.3f9a1c2b.css"): os.path.join("static", "index.css"),
+            os.path.join("docs", "images", "tom.66709e99.png"): os.path.join("static", "images", "tom.png"),
+            os.path.join("docs", "images", "tom-480w.png"): os.path.join(".build", "images", "abc-480.png"),
+        }
+
+        self.assertDictEqual(asset_urls(assets, "static", "docs"), {
+            "/images/tom.png": "/images/tom.66709e99.png",
+            "/index.css": "/index.3f9a1c2b.css",
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
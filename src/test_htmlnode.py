@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
@@ -147,5 +148,37 @@ class TestParentNode(unittest.TestCase):
         )
 
 
+class TestSlots(unittest.TestCase):
+    def test_nodes_have_no_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "text"), ParentNode("p", [LeafNode(None, "text")])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_repr_shouldStillWork(self):
+        node = LeafNode("a", "link", { "href": "/" })
+        self.assertEqual(repr(node), """HTMLNode("a", "link", None, {'href': '/'})""")
+
+
+class TestStreaming(unittest.TestCase):
+    def test_iter_html_shouldMatchToHtml(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")]),
+            LeafNode("a", "link", { "href": "/path" }),
+        ], { "class": "content" })
+
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_write_html_shouldWriteChunks(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(3)])
+        stream = io.StringIO()
+
+        node.write_html(stream)
+
+        self.assertEqual(stream.getvalue(), "<ul><li>item 0</li><li>item 1</li><li>item 2</li></ul>")
+
+    def test_iter_html_shouldRaiseWithoutChildren(self):
+        node = ParentNode("p", [])
+        self.assertRaises(ValueError, list, node.iter_html())
+
+
 if __name__ == "__main__":
     unittest.main()
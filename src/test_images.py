@@ -0,0 +1,109 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from images import Image, ImageInfo, ImagePipeline, image_size, variant_path
+from fixtures import TempDirTestCase
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    frame = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + frame
+
+
+class Test_image_size(TempDirTestCase):
+    def test_png(self):
+        self.assertEqual(image_size(self.write("a.png", png_header(1344, 896))), (1344, 896))
+
+    def test_gif(self):
+        self.assertEqual(image_size(self.write("a.gif", b"GIF89a" + struct.pack("<HH", 320, 200))), (320, 200))
+
+    def test_jpeg(self):
+        self.assertEqual(image_size(self.write("a.jpg", jpeg_header(1100, 438))), (1100, 438))
+
+    def test_unknown(self):
+        self.assertIsNone(image_size(self.write("a.png", b"not an image")))
+
+
+class Test_ImageInfo(unittest.TestCase):
+    def test_variant_path(self):
+        self.assertEqual(variant_path("/images/tom.png", 480), "/images/tom-480w.png")
+        self.assertEqual(variant_path("/images/tom.png", 480, "0123456789abcdef"), "/images/tom-480w.01234567.png")
+
+    def test_attributes(self):
+        info = ImageInfo("/images/tom.png", 928, 468, [480])
+
+        self.assertDictEqual(info.attributes("/base/"), {
+            "width": "928",
+            "height": "468",
+            "srcset": "/base/images/tom-480w.png 480w, /base/images/tom.png 928w",
+            "loading": "lazy",
+        })
+
+    def test_attributes_with_fingerprinted_variants(self):
+        info = ImageInfo("/images/tom.png", 928, 468, [480], "0123456789abcdef")
+
+        self.assertEqual(info.attributes()["srcset"], "/images/tom-480w.01234567.png 480w, /images/tom.png 928w")
+
+    def test_attributes_without_variants(self):
+        self.assertNotIn("srcset", ImageInfo("/images/tom.png", 928, 468, []).attributes())
+
+
+class Test_ImagePipeline(unittest.TestCase):
+    def test_measures_static_images(self):
+        with tempfile.TemporaryDirectory() as root:
+            static = os.path.join(root, "static")
+            os.makedirs(os.path.join(static, "images"))
+            with open(os.path.join(static, "images", "tom.png"), "wb") as file:
+                file.write(png_header(400, 200))
+            with open(os.path.join(static, "index.css"), "w") as file:
+                file.write("body {}")
+
+            cache = os.path.join(root, "cache")
+            report = ImagePipeline(cache).process(static, os.path.join(root, "public"))
+
+            self.assertListEqual(list(report.images), ["/images/tom.png"])
+            self.assertEqual(report.images["/images/tom.png"].width, 400)
+            self.assertIn(os.path.join(static, "images", "tom.png"), ImagePipeline(cache).index)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_writes_cached_variants(self):
+        with tempfile.TemporaryDirectory() as root:
+            static = os.path.join(root, "static")
+            public = os.path.join(root, "public")
+            os.makedirs(static)
+            Image.new("RGB", (1000, 500)).save(os.path.join(static, "wide.png"))
+
+            report = ImagePipeline(os.path.join(root, "cache")).process(static, public)
+
+            self.assertListEqual(report.images["/wide.png"].variants, [480, 960])
+            self.assertEqual(image_size(os.path.join(public, "wide-480w.png")), (480, 240))
+            self.assertEqual(len(report.written), 2)
+
+            report = ImagePipeline(os.path.join(root, "cache")).process(static, public)
+
+            self.assertListEqual(report.written, [])
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_fingerprints_variants(self):
+        with tempfile.TemporaryDirectory() as root:
+            static = os.path.join(root, "static")
+            public = os.path.join(root, "public")
+            os.makedirs(static)
+            Image.new("RGB", (1000, 500)).save(os.path.join(static, "wide.png"))
+            digest = ImagePipeline(os.path.join(root, "cache")).measure(os.path.join(static, "wide.png"))[0]
+
+            report = ImagePipeline(os.path.join(root, "cache")).process(static, public, fingerprinted=True)
+
+            self.assertIn(variant_path(os.path.join(public, "wide.png"), 480, digest), report.variants)
+            self.assertIn(f"/wide-480w.{digest[:8]}.png 480w", report.images["/wide.png"].attributes()["srcset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
+import contextlib
+import io
+import os
+import tempfile
 import unittest
 
 from textnode import TextType, TextNode
+import compress
+import images
+import minify
+import profiling
+import siteindex
+import fingerprint
 from main import (
     text_node_to_html_node, 
     split_nodes_delimiter, 
@@ -10,8 +20,23 @@ from main import (
     split_nodes_link,
     text_to_textnodes,
     markdown_to_blocks,
-    markdown_to_html_node
+    markdown_to_html_node,
+    markdown_lines_to_html,
+    PageInfo,
+    text_to_html_nodes,
+    inline_to_html_node,
+    inline_html,
+    read_title,
+    collect_pages,
+    page_template_path,
+    generate_pages_recursively,
+    enable_profiling,
+    explain,
+    CHANGED_PATH,
+    REMOVED_PATH
 )
+from fixtures import SiteTestCase, TempDirTestCase
+from test_images import png_header
 
 
 class Test_TextNode_to_HTMLNode(unittest.TestCase):
@@ -62,6 +87,16 @@ class Test_TextNode_to_HTMLNode(unittest.TestCase):
         self.assertEqual(html_node.props["src"], "this/is/image/url")
         self.assertEqual(html_node.props["alt"], "This is an image node")
 
+    def test_link_basepath(self):
+        node = TextNode("home", TextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, "/site/")
+        self.assertEqual(html_node.to_html(), '<a href="/site/blog/tom">home</a>')
+
+    def test_image_basepath_absolute_url(self):
+        node = TextNode("logo", TextType.IMAGE, "https://example.com/logo.png")
+        html_node = text_node_to_html_node(node, "/site/")
+        self.assertEqual(html_node.to_html(), '<img src="https://example.com/logo.png" alt="logo"></img>')
+
     def test_invalid(self):
         node = TextNode("This is an invalid node", None) # type: ignore
         self.assertRaises(Exception, text_node_to_html_node, node)
@@ -331,6 +366,33 @@ class Test_text_to_textnodes(unittest.TestCase):
 
         self.assertListEqual(actual, expected)
 
+    def test_plain_text(self):
+        text = "This is plain text"
+        expected = [TextNode("This is plain text", TextType.TEXT)]
+
+        actual = text_to_textnodes(text)
+
+        self.assertListEqual(actual, expected)
+
+    def test_empty(self):
+        self.assertListEqual(text_to_textnodes(""), [TextNode("", TextType.TEXT)])
+
+    def test_delimiters_inside_code(self):
+        text = "Call `snake_case_name` **now**"
+        expected = [
+            TextNode("Call ", TextType.TEXT),
+            TextNode("snake_case_name", TextType.CODE),
+            TextNode(" ", TextType.TEXT),
+            TextNode("now", TextType.BOLD),
+        ]
+
+        actual = text_to_textnodes(text)
+
+        self.assertListEqual(actual, expected)
+
+    def test_unterminated(self):
+        self.assertRaises(Exception, text_to_textnodes, "This is **unterminated bold")
+
 
 class Test_markdown_to_blocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -394,6 +456,323 @@ the **same** even with inline stuff
             f"\nExpected: {expected}\nActual: {actual}"
         )
 
+    def test_streaming_matches_tree(self):
+        md = """
+# Title
+
+This is **bolded** paragraph
+with a [link](/blog/tom)
+
+- one
+- two
+
+```
+code
+```
+"""
+        expected = markdown_to_html_node(md, "/base/").to_html()
+
+        actual = "".join(markdown_lines_to_html(md.split("\n"), "/base/"))
+
+        self.assertEqual(actual, expected)
+
+    def test_streaming_collects_references(self):
+        md = "# Title\n\n- [Tom](/blog/tom)\n- ![Tom](/images/tom.png)\n\n```\n[not a link](/code)\n```"
+        info = PageInfo(index=True)
+
+        "".join(markdown_lines_to_html(md.split("\n"), "/base/", info))
+
+        self.assertListEqual(info.references, ["/blog/tom", "/images/tom.png"])
+        self.assertSetEqual(info.terms, { "title", "tom" })
+
+    def test_streaming_empty(self):
+        self.assertRaises(ValueError, list, markdown_lines_to_html(["", "  ", ""]))
+
+
+class Test_image_attributes(unittest.TestCase):
+    def tearDown(self):
+        images.enable(None)
+
+    def test_image_stage_adds_dimensions(self):
+        images.enable({ "/images/tom.png": images.ImageInfo("/images/tom.png", 928, 468, []) })
+
+        html_node = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"), "/base/")
+
+        self.assertEqual(
+            html_node.to_html(),
+            '<img src="/base/images/tom.png" alt="Tom" width="928" height="468" loading="lazy"></img>'
+        )
+
+
+class Test_fingerprinted_urls(unittest.TestCase):
+    def tearDown(self):
+        fingerprint.enable(None)
+
+    def test_links_and_images_use_fingerprinted_names(self):
+        fingerprint.enable({ "/images/tom.png": "/images/tom.66709e99.png" })
+
+        image = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"), "/base/")
+        link = text_node_to_html_node(TextNode("Tom", TextType.LINK, "/images/tom.png"), "/base/")
+        page = text_node_to_html_node(TextNode("Tom", TextType.LINK, "/blog/tom"), "/base/")
+
+        self.assertEqual(image.to_html(), '<img src="/base/images/tom.66709e99.png" alt="Tom"></img>')
+        self.assertEqual(link.to_html(), '<a href="/base/images/tom.66709e99.png">Tom</a>')
+        self.assertEqual(page.to_html(), '<a href="/base/blog/tom">Tom</a>')
+
+
+class Test_inline_to_html_node(unittest.TestCase):
+    def test_matches_text_to_html_nodes(self):
+        text = "Read **more** in [the blog](/blog/tom)"
+        expected = text_to_html_nodes(text, "li", "/base/").to_html()
+
+        actual = inline_to_html_node(text, "li", "/base/", memo=True).to_html()
+
+        self.assertEqual(actual, expected)
+
+    def test_repeated_text_hits_memo(self):
+        text = "[Home](/) | [Blog](/blog)"
+        inline_to_html_node(text, "li", memo=True)
+        hits = inline_html.cache_info().hits
+
+        inline_to_html_node(text, "li", memo=True)
+
+        self.assertEqual(inline_html.cache_info().hits, hits + 1)
+
+    def test_long_text_is_not_memoized(self):
+        text = "word " * 100
+        node = inline_to_html_node(text, "p", memo=True)
+
+        self.assertEqual(node.tag, "p")
+
+    def test_tree_is_built_without_memo(self):
+        text = "[Home](/) | [Blog](/blog)"
+        hits = inline_html.cache_info().hits
+
+        node = markdown_to_html_node(f"# {text}\n\n{text}").children[1]
+
+        self.assertEqual(node.tag, "p")
+        self.assertEqual(node.children[0].tag, "a")
+        self.assertEqual(inline_html.cache_info().hits, hits)
+
+
+class Test_read_title(unittest.TestCase):
+    def test_reads_first_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.md")
+            with open(path, "w") as file:
+                file.write("\n\n# Streaming title\n\nBody text\n")
+
+            self.assertEqual(read_title(path), "Streaming title")
+
+
+class Test_generate_pages_recursively(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        for i in range(5):
+            self.write(os.path.join(self.content, "blog", f"post{i}", "index.md"), f"# Post {i}\n\n- item _{i}_")
+
+    def read_tree(self, directory):
+        files = {}
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as file:
+                    files[os.path.relpath(path, directory)] = file.read()
+        return files
+
+    def test_collect_pages(self):
+        pages = collect_pages(self.content, "public", self.template)
+
+        self.assertIn((os.path.join(self.content, "index.md"), self.template, os.path.join("public", "index.html")), pages)
+        self.assertEqual(len(pages), 6)
+
+    def test_collect_pages_is_ordered(self):
+        self.write(os.path.join(self.content, "notes.txt"), "not a page")
+
+        pages = collect_pages(self.content, "public", self.template)
+
+        self.assertListEqual([from_path for from_path, _, _ in pages], [
+            *[os.path.join(self.content, "blog", f"post{i}", "index.md") for i in range(5)],
+            os.path.join(self.content, "index.md"),
+        ])
+
+    def test_directory_templates_are_inherited(self):
+        blog_template = os.path.join(self.content, "blog", "_template.html")
+        self.write(blog_template, "<main>{{ Content }}</main>")
+
+        pages = collect_pages(self.content, "public", self.template)
+        templates = { from_path: template_path for from_path, template_path, _ in pages }
+
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(templates[os.path.join(self.content, "index.md")], self.template)
+        self.assertEqual(templates[os.path.join(self.content, "blog", "post3", "index.md")], blog_template)
+        self.assertEqual(
+            page_template_path(os.path.join(self.content, "blog", "post3", "index.md"), self.content, self.template),
+            blog_template
+        )
+        self.assertEqual(page_template_path(os.path.join(self.content, "index.md"), self.content, self.template), self.template)
+
+        out = os.path.join(self.root, "out")
+        generate_pages_recursively(self.content, self.template, out, "/", jobs=2)
+
+        with open(os.path.join(out, "blog", "post3", "index.html")) as file:
+            self.assertTrue(file.read().startswith("<main><div><h1>Post 3</h1>"))
+        with open(os.path.join(out, "index.html")) as file:
+            self.assertTrue(file.read().startswith("<title>Home</title>"))
+
+    def test_profile_times_the_real_render_path(self):
+        plain = os.path.join(self.root, "plain")
+        profiled = os.path.join(self.root, "profiled")
+        generate_pages_recursively(self.content, self.template, plain, "/")
+
+        profiler = enable_profiling()
+        self.addCleanup(setattr, profiling, "PROFILER", None)
+        generate_pages_recursively(self.content, self.template, profiled, "/")
+
+        self.assertDictEqual(self.read_tree(plain), self.read_tree(profiled))
+        self.assertEqual(profiler.stages["render_page"][1], 6)
+        self.assertEqual(profiler.stages["read_source"][1], 6)
+        self.assertNotIn("page_info", profiler.stages)
+        self.assertEqual(len(profiler.pages), 6)
+
+    def test_parallel_profile_includes_worker_stages(self):
+        profiler = enable_profiling()
+        self.addCleanup(setattr, profiling, "PROFILER", None)
+
+        generate_pages_recursively(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2)
+
+        self.assertEqual(profiler.stages["read_source"][1], 6)
+        self.assertEqual(profiler.stages["write_output"][1], 6)
+        self.assertEqual(profiler.stages["render_page"][1], 6)
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+
+        generate_pages_recursively(self.content, self.template, serial, "/base/")
+        generate_pages_recursively(self.content, self.template, parallel, "/base/", jobs=2)
+
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_error_reports_page(self):
+        broken = os.path.join(self.content, "broken", "index.md")
+        self.write(broken, "no title here")
+
+        with self.assertRaises(Exception) as context:
+            generate_pages_recursively(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2)
+
+        self.assertIn(broken, str(context.exception))
+
+    def test_read_error_reports_page(self):
+        broken = os.path.join(self.content, "broken", "index.md")
+        self.write(broken, b"# Broken \xff\xfe")
+
+        for jobs in (1, 2):
+            with self.assertRaises(Exception) as context:
+                generate_pages_recursively(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=jobs)
+
+            self.assertIn(broken, str(context.exception))
+            self.assertIn("utf-8", str(context.exception))
+
+
+class Test_build(SiteTestCase):
+    def test_lists_removed_outputs(self):
+        self.build()
+        os.remove(os.path.join("content", "contact", "index.md"))
+        os.remove(os.path.join("static", "index.css"))
+
+        self.build()
+
+        self.assertListEqual(self.lines(REMOVED_PATH), [
+            os.path.join(".", "docs", "contact", "index.html"),
+            os.path.join(".", "docs", "index.css"),
+        ])
+        self.assertListEqual(self.lines(CHANGED_PATH), [])
+        self.assertFalse(os.path.exists(os.path.join("docs", "contact")))
+        self.assertIn("2 output files removed", self.output.getvalue())
+
+    def sidecars(self):
+        return sorted(
+            os.path.join(directory, filename)
+            for directory, _, filenames in os.walk("docs")
+            for filename in filenames
+            if filename.endswith(compress.SIDECAR_EXTENSIONS)
+        )
+
+    def test_compress_off_removes_sidecars(self):
+        compress.enable(9, 0)
+        minify.enable(os.path.join(".build", "minify"))
+        self.build(fingerprint_assets=True)
+        sidecars = self.sidecars()
+        self.assertEqual(len(sidecars), 4 * len(compress.encodings()))
+
+        compress.SETTINGS = None
+        minify.SETTINGS = None
+        self.build()
+
+        self.assertListEqual(self.sidecars(), [])
+        removed = self.lines(REMOVED_PATH)
+        for path in sidecars:
+            self.assertIn(os.path.join(".", path), removed)
+
+    def test_compress_settings_change_recompresses(self):
+        css = os.path.join(".", "docs", "index.css.gz")
+        compress.enable(1, 64)
+        self.build()
+        self.build()
+        self.assertNotIn(css, self.lines(CHANGED_PATH))
+
+        compress.enable(9, 64)
+        self.build()
+
+        self.assertIn(css, self.lines(CHANGED_PATH))
+
+    def test_image_stage_change_rerenders_inline_html(self):
+        self.write(os.path.join("static", "images", "tom.png"), png_header(400, 200))
+        self.write(os.path.join("content", "index.md"), "# Home\n\n![Tom](/images/tom.png)")
+        self.build()
+        self.assertIn('<img src="/images/tom.png" alt="Tom">', self.read(os.path.join("docs", "index.html")))
+
+        self.build(image_stage=True)
+        self.assertIn('width="400" height="200"', self.read(os.path.join("docs", "index.html")))
+
+        self.build()
+        self.assertIn('<img src="/images/tom.png" alt="Tom">', self.read(os.path.join("docs", "index.html")))
+
+    def test_site_indexes_are_removed_with_their_flags(self):
+        self.write(os.path.join("content", "blog", "tom", "index.md"), "# Tom")
+        siteindex.enable()
+        compress.enable(9, 0)
+        self.build(site_url="https://example.com")
+        indexes = [os.path.join(".", "docs", path) for path in ("sitemap.xml", os.path.join("blog", "feed.xml"), "search.json")]
+        for path in indexes:
+            self.assertTrue(os.path.isfile(path + ".gz"))
+
+        siteindex.SEARCH_INDEX = False
+        compress.SETTINGS = None
+        self.build()
+
+        removed = self.lines(REMOVED_PATH)
+        for path in indexes:
+            self.assertFalse(os.path.exists(path))
+            self.assertFalse(os.path.exists(path + ".gz"))
+            self.assertIn(path, removed)
+            self.assertIn(path + ".gz", removed)
+
+    def test_explain_follows_fingerprinted_template_assets(self):
+        self.build(fingerprint_assets=True)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            explain([os.path.join("static", "index.css")])
+
+        self.assertIn("static/index.css: 2 dependent pages", output.getvalue())
+        self.assertIn(f"{os.path.join('.', 'docs', 'contact', 'index.html')} (/index.css)", output.getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()
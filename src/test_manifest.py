@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, remove_untracked
+from fixtures import TempDirTestCase
+
+
+class Test_BuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "index.md")
+        self.template = os.path.join(self.root, "template.html")
+        self.dest = os.path.join(self.root, "public", "index.html")
+
+        self.write(self.source, "# Title")
+        self.write(self.template, "{{ Content }}")
+        self.write(self.dest, "<h1>Title</h1>")
+
+    def test_fresh_after_record(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        dependencies = manifest.page_dependencies(self.source, self.template, "/")
+
+        self.assertFalse(manifest.is_fresh(self.dest, dependencies))
+        manifest.record(self.dest, dependencies)
+        self.assertTrue(manifest.is_fresh(self.dest, dependencies))
+
+    def test_source_change(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.record(self.dest, manifest.page_dependencies(self.source, self.template, "/"))
+
+        self.write(self.source, "# Other title")
+        dependencies = manifest.page_dependencies(self.source, self.template, "/")
+
+        self.assertFalse(manifest.is_fresh(self.dest, dependencies))
+
+    def test_basepath_change(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.record(self.dest, manifest.page_dependencies(self.source, self.template, "/"))
+
+        dependencies = manifest.page_dependencies(self.source, self.template, "/blog/")
+
+        self.assertFalse(manifest.is_fresh(self.dest, dependencies))
+
+    def test_save_and_load(self):
+        path = os.path.join(self.root, "cache", "manifest.json")
+        manifest = BuildManifest(path)
+        dependencies = manifest.page_dependencies(self.source, self.template, "/")
+        manifest.record(self.dest, dependencies)
+        manifest.save()
+
+        loaded = BuildManifest(path)
+        loaded.load()
+
+        self.assertTrue(loaded.is_fresh(self.dest, dependencies))
+
+    def test_remove_stale(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.record(self.dest, manifest.page_dependencies(self.source, self.template, "/"))
+
+        removed = manifest.remove_stale(set(), os.path.join(self.root, "public"))
+
+        self.assertListEqual(removed, [self.dest])
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "public")))
+        self.assertDictEqual(manifest.entries, {})
+
+    def test_dependents(self):
+        public = os.path.join(self.root, "public")
+        image = os.path.join(self.root, "static", "images", "tom.png")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.assets[os.path.join(public, "images", "tom.png")] = image
+        manifest.record(
+            self.dest,
+            manifest.page_dependencies(self.source, self.template, "/"),
+            ["/images/tom.png", "https://www.boot.dev"]
+        )
+
+        self.assertListEqual(manifest.dependents(self.source, public), [(self.dest, "source")])
+        self.assertListEqual(manifest.dependents(self.template, public), [(self.dest, "template")])
+        self.assertListEqual(manifest.dependents(image, public), [(self.dest, "/images/tom.png")])
+        self.assertListEqual(manifest.dependents(os.path.join(self.root, "other.png"), public), [])
+
+    def test_broken_references(self):
+        public = os.path.join(self.root, "public")
+        post = os.path.join(public, "blog", "tom", "index.html")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.record(post, manifest.page_dependencies(self.source, self.template, "/"), [])
+        manifest.record(
+            self.dest,
+            manifest.page_dependencies(self.source, self.template, "/"),
+            ["/", "/blog/tom", "/blog/tom#top", "/blog/jerry", "https://www.boot.dev"]
+        )
+
+        self.assertListEqual(manifest.broken_references(public), [(self.dest, "/blog/jerry")])
+
+    def test_references_to_renamed_assets(self):
+        public = os.path.join(self.root, "public")
+        image = os.path.join(self.root, "static", "images", "tom.png")
+        self.write(image, "png bytes")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.assets[os.path.join(public, "images", "tom.3f9a1c2b.png")] = image
+        manifest.record(self.dest, manifest.page_dependencies(self.source, self.template, "/"), ["/images/tom.png"])
+
+        self.assertListEqual(manifest.broken_references(public), [])
+        self.assertListEqual(manifest.dependents(image, public), [(self.dest, "/images/tom.png")])
+        self.assertNotEqual(manifest.reference_hash(["/images/tom.png"], public), manifest.reference_hash([], public))
+
+    def test_dependents_through_template_urls(self):
+        public = os.path.join(self.root, "public")
+        css = os.path.join(self.root, "static", "index.css")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.assets[os.path.join(public, "index.3f9a1c2b.css")] = css
+        dependencies = manifest.page_dependencies(self.source, self.template, "/")
+        manifest.record(self.dest, dependencies, [])
+        template_urls = lambda path: ["/index.css"]
+
+        self.assertListEqual(manifest.dependents(css, public, template_urls), [])
+
+        manifest.record(self.dest, dependencies | { "fingerprint": "assets" }, [])
+
+        self.assertListEqual(manifest.dependents(css, public), [])
+        self.assertListEqual(manifest.dependents(css, public, template_urls), [(self.dest, "/index.css")])
+
+
+class Test_remove_untracked(unittest.TestCase):
+    def test_removes_files_not_in_outputs(self):
+        with tempfile.TemporaryDirectory() as root:
+            kept = os.path.join(root, "index.html")
+            old = os.path.join(root, "blog", "old", "index.html")
+            for path in (kept, old):
+                os.makedirs(os.path.split(path)[0], exist_ok=True)
+                with open(path, "w") as file:
+                    file.write("<p></p>")
+
+            removed = remove_untracked(root, { kept })
+
+            self.assertListEqual(removed, [old])
+            self.assertListEqual(os.listdir(root), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
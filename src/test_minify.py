@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from minify import MinifyCache, minify_css, minify_html
+
+
+class Test_minify_html(unittest.TestCase):
+    def test_collapses_layout_whitespace(self):
+        html = "<html>\n  <head>\n    <title>Tolkien  Fan Club</title>\n  </head>\n</html>\n"
+
+        self.assertEqual(minify_html(html), "<html><head><title>Tolkien Fan Club</title></head></html> ")
+
+    def test_keeps_inline_spaces(self):
+        self.assertEqual(minify_html("<a>one</a> <a>two</a>"), "<a>one</a> <a>two</a>")
+
+    def test_keeps_preformatted_text(self):
+        html = "<div>\n  <pre><code>func main(){\n    fmt.Println()\n}\n</code></pre>\n</div>"
+
+        self.assertEqual(minify_html(html), "<div><pre><code>func main(){\n    fmt.Println()\n}\n</code></pre></div>")
+
+    def test_removes_comments(self):
+        self.assertEqual(minify_html("<p>a</p><!-- note --><p>b</p>"), "<p>a</p><p>b</p>")
+
+
+class Test_minify_css(unittest.TestCase):
+    def test_minifies_rules(self):
+        css = "/* theme */\nh1,\nh2 {\n  color: #dda15e;\n  margin: 0 auto;\n}\n\na > b {\n  color: red;\n}\n"
+
+        self.assertEqual(minify_css(css), "h1,h2{color:#dda15e;margin:0 auto}a>b{color:red}")
+
+    def test_keeps_strings_and_selectors(self):
+        css = 'body { font-family: "Luminari,  Georgia"; }\na :hover { width: calc(1px + 2px); }'
+
+        self.assertEqual(minify_css(css), 'body{font-family:"Luminari,  Georgia"}a :hover{width:calc(1px + 2px)}')
+
+
+class Test_MinifyCache(unittest.TestCase):
+    def test_reuses_cached_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            MinifyCache(directory).minify("css", "a { color: red; }")
+            cache = MinifyCache(directory)
+
+            self.assertEqual(cache.minify("css", "a { color: red; }"), "a{color:red}")
+            self.assertEqual(cache.counters["minify cache hits"], 1)
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
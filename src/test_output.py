@@ -0,0 +1,84 @@
+import os
+import unittest
+
+from output import AtomicOutput, write_output
+from fixtures import TempDirTestCase
+
+
+class Test_write_output(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+
+    def test_writes_new_file(self):
+        self.assertTrue(write_output(self.path, "<h1>Tolkien</h1>"))
+
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "<h1>Tolkien</h1>")
+
+    def test_skips_identical_file(self):
+        write_output(self.path, "<h1>Tolkien</h1>")
+        os.utime(self.path, ns=(0, 0))
+
+        self.assertFalse(write_output(self.path, "<h1>Tolkien</h1>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+
+    def test_replaces_changed_file(self):
+        write_output(self.path, "<h1>Tolkien</h1>")
+
+        self.assertTrue(write_output(self.path, "<h1>Glorfindel</h1>"))
+
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "<h1>Glorfindel</h1>")
+        self.assertListEqual(os.listdir(self.root), ["index.html"])
+
+    def test_new_file_mode_follows_umask(self):
+        self.addCleanup(os.umask, os.umask(0o027))
+
+        write_output(self.path, "<h1>Tolkien</h1>")
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def test_replaced_file_keeps_its_mode(self):
+        write_output(self.path, "<h1>Tolkien</h1>")
+        os.chmod(self.path, 0o604)
+
+        write_output(self.path, "<h1>Glorfindel</h1>")
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o604)
+
+
+class Test_AtomicOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+
+    def write_atomic(self, contents):
+        output = AtomicOutput(self.path)
+        with output as file:
+            file.write(contents)
+        return output.changed
+
+    def test_streams_and_compares(self):
+        self.assertTrue(self.write_atomic("<p>one</p>"))
+        self.assertFalse(self.write_atomic("<p>one</p>"))
+        self.assertTrue(self.write_atomic("<p>two</p>"))
+
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "<p>two</p>")
+
+    def test_error_keeps_previous_file(self):
+        self.write_atomic("<p>one</p>")
+
+        with self.assertRaises(ValueError):
+            with AtomicOutput(self.path) as file:
+                file.write("<p>partial")
+                raise ValueError("render failed")
+
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "<p>one</p>")
+        self.assertListEqual(os.listdir(self.root), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from pipeline import ReadAhead, WriteBehind, make_dirs
+
+
+class Test_make_dirs(unittest.TestCase):
+    def test_creates_each_directory_once(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [
+                os.path.join(root, "blog", "tom", "index.html"),
+                os.path.join(root, "blog", "tom", "extra.html"),
+                os.path.join(root, "contact", "index.html"),
+                os.path.join(root, "index.html"),
+            ]
+
+            self.assertEqual(make_dirs(paths), 2)
+            self.assertTrue(os.path.isdir(os.path.join(root, "blog", "tom")))
+            self.assertEqual(make_dirs(paths), 0)
+
+
+class Test_ReadAhead(unittest.TestCase):
+    def test_yields_in_order(self):
+        paths = [f"page{i}.md" for i in range(50)]
+
+        with ReadAhead(paths, lambda path: path.upper(), 4, 3) as sources:
+            results = list(sources)
+
+        self.assertListEqual(results, [(path, path.upper()) for path in paths])
+
+    def test_bounded(self):
+        started: list[str] = []
+        lock = threading.Lock()
+
+        def read(path):
+            with lock:
+                started.append(path)
+            return path
+
+        paths = [f"page{i}.md" for i in range(20)]
+
+        with ReadAhead(paths, read, 3, 2) as sources:
+            iterator = iter(sources)
+            next(iterator)
+
+            self.assertLessEqual(len(started), 3)
+
+    def test_raises_read_errors(self):
+        def read(path):
+            raise OSError(f"cannot read {path}")
+
+        with ReadAhead(["missing.md"], read, 2, 1) as sources:
+            self.assertRaises(OSError, list, sources)
+
+
+class Test_WriteBehind(unittest.TestCase):
+    def test_writes_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [os.path.join(root, f"page{i}.html") for i in range(10)]
+
+            with WriteBehind(2, 2) as writer:
+                for path in paths:
+                    writer.write(path, f"<p>{path}</p>")
+
+            self.assertEqual(writer.written, 10)
+            self.assertListEqual(writer.changed, paths)
+            for path in paths:
+                with open(path) as file:
+                    self.assertEqual(file.read(), f"<p>{path}</p>")
+
+    def test_skips_unchanged_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.html")
+
+            with WriteBehind(2, 1) as writer:
+                writer.write(path, "<p>one</p>")
+            with WriteBehind(2, 1) as writer:
+                writer.write(path, "<p>one</p>")
+
+            self.assertListEqual(writer.changed, [])
+
+    def test_raises_write_errors(self):
+        with tempfile.TemporaryDirectory() as root:
+            writer = WriteBehind(2, 1)
+            writer.write(os.path.join(root, "missing", "page.html"), "")
+
+            self.assertRaises(OSError, writer.close)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+from profiling import Profiler
+
+
+class Test_Profiler(unittest.TestCase):
+    def test_instrument_counts_calls(self):
+        profiler = Profiler()
+        namespace = { "double": lambda x: x * 2 }
+
+        profiler.instrument(namespace, ["double"])
+        profiler.instrument(namespace, ["double"])
+        results = [namespace["double"](i) for i in range(3)]
+
+        self.assertListEqual(results, [0, 2, 4])
+        self.assertEqual(profiler.stages["double"][1], 3)
+
+    def test_pages_are_merged_into_stages(self):
+        profiler = Profiler()
+
+        profiler.begin_page()
+        with profiler.measure("to_html"):
+            pass
+        page = profiler.end_page()
+        profiler.add_page("index.html", page)
+
+        self.assertEqual(profiler.stages["to_html"][1], 1)
+        self.assertIn("index.html", profiler.pages)
+        self.assertGreaterEqual(profiler.pages["index.html"]["total"][0], 0)
+
+    def test_other_threads_record_into_stages(self):
+        profiler = Profiler()
+
+        profiler.begin_page()
+        thread = threading.Thread(target=profiler.record, args=("write_output", 0.5))
+        thread.start()
+        thread.join()
+        page = profiler.end_page()
+
+        self.assertNotIn("write_output", page)
+        self.assertListEqual(profiler.stages["write_output"], [0.5, 1])
+
+    def test_slowest_pages(self):
+        profiler = Profiler()
+        profiler.add_page("fast.html", { "total": [0.1, 1] })
+        profiler.add_page("slow.html", { "total": [0.9, 1] })
+        profiler.add_page("medium.html", { "total": [0.5, 1] })
+
+        slowest = [path for path, _ in profiler.slowest_pages(2)]
+
+        self.assertListEqual(slowest, ["slow.html", "medium.html"])
+
+    def test_write_json(self):
+        profiler = Profiler()
+        profiler.record("walk", 0.25)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report", "profile.json")
+            profiler.write_json(path)
+
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertDictEqual(report["stages"]["walk"], { "seconds": 0.25, "calls": 1 })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import contextlib
+import gzip
+import os
+import unittest
+
+from main import MANIFEST_PATH
+from serve import WORKER_CONTEXT, Watcher, initial_build, parse_args, snapshot, diff_snapshots
+from fixtures import SiteTestCase, TempDirTestCase
+from test_images import png_header
+
+
+class Test_snapshot(TempDirTestCase):
+    def test_snapshot_walks_directories(self):
+        page = os.path.join(self.root, "content", "blog", "index.md")
+        template = os.path.join(self.root, "template.html")
+        self.write(page, "# Blog")
+        self.write(template, "{{ Content }}")
+
+        files = snapshot([os.path.join(self.root, "content"), template, os.path.join(self.root, "missing")])
+
+        self.assertSetEqual(set(files), { page, template })
+
+    def test_diff_snapshots(self):
+        old = { "a.md": (1, 10), "b.md": (1, 10), "c.md": (1, 10) }
+        new = { "a.md": (1, 10), "b.md": (2, 10), "d.md": (1, 10) }
+
+        changed, removed = diff_snapshots(old, new)
+
+        self.assertSetEqual(changed, { "b.md", "d.md" })
+        self.assertSetEqual(removed, { "c.md" })
+
+
+class Test_Watcher(SiteTestCase):
+    def start(self, *argv):
+        with contextlib.redirect_stdout(self.output):
+            manifest = initial_build(parse_args(["--watch", *argv]))
+        return Watcher("/", 1, manifest)
+
+    def poll(self, watcher):
+        with contextlib.redirect_stdout(self.output):
+            return watcher.poll()
+
+    def test_page_change_rebuilds_only_that_page(self):
+        home = os.path.join("docs", "index.html")
+        watcher = self.start()
+        os.utime(home, ns=(0, 0))
+
+        self.write(os.path.join("content", "contact", "index.md"), "# Contact us")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertIn("<h1>Contact us</h1>", self.read(os.path.join("docs", "contact", "index.html")))
+        self.assertEqual(os.stat(home).st_mtime_ns, 0)
+        self.assertFalse(self.poll(watcher))
+
+    def test_template_change_rerenders_every_page(self):
+        watcher = self.start()
+
+        self.write("template.html", "<main>{{ Content }}</main>")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertTrue(self.read(os.path.join("docs", "index.html")).startswith("<main>"))
+        self.assertTrue(self.read(os.path.join("docs", "contact", "index.html")).startswith("<main>"))
+
+    def test_template_change_renders_in_spawned_workers(self):
+        watcher = self.start()
+        watcher.jobs = 2
+
+        self.write("template.html", "<main>{{ Content }}</main>")
+
+        self.assertEqual(WORKER_CONTEXT.get_start_method(), "spawn")
+        self.assertTrue(self.poll(watcher))
+
+        self.assertTrue(self.read(os.path.join("docs", "index.html")).startswith("<main>"))
+        self.assertTrue(self.read(os.path.join("docs", "contact", "index.html")).startswith("<main>"))
+
+    def test_directory_template_rerenders_its_pages(self):
+        home = os.path.join("docs", "index.html")
+        watcher = self.start()
+        os.utime(home, ns=(0, 0))
+
+        self.write(os.path.join("content", "contact", "_template.html"), "<main>{{ Content }}</main>")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertTrue(self.read(os.path.join("docs", "contact", "index.html")).startswith("<main>"))
+        self.assertEqual(os.stat(home).st_mtime_ns, 0)
+
+    def test_deleted_page_is_removed(self):
+        watcher = self.start()
+        self.assertIn(os.path.join(".", "docs", "contact", "index.html"), watcher.manifest.entries)
+
+        os.remove(os.path.join("content", "contact", "index.md"))
+
+        self.assertTrue(self.poll(watcher))
+        self.assertFalse(os.path.exists(os.path.join("docs", "contact")))
+        self.assertNotIn(os.path.join(".", "docs", "contact", "index.html"), watcher.manifest.entries)
+        self.assertTrue(os.path.isfile(os.path.join("docs", "index.html")))
+
+    def test_manifest_is_saved_on_the_next_idle_poll(self):
+        watcher = self.start()
+        os.utime(MANIFEST_PATH, ns=(0, 0))
+
+        self.write(os.path.join("content", "contact", "index.md"), "# Contact us")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertEqual(os.stat(MANIFEST_PATH).st_mtime_ns, 0)
+        self.assertFalse(self.poll(watcher))
+        self.assertNotEqual(os.stat(MANIFEST_PATH).st_mtime_ns, 0)
+
+    def test_image_change_rebuilds_referencing_pages(self):
+        self.write(os.path.join("static", "images", "tom.png"), png_header(400, 200))
+        self.write(os.path.join("content", "index.md"), "# Home\n\n![Tom](/images/tom.png)")
+        watcher = self.start("--images")
+        self.assertIn('width="400"', self.read(os.path.join("docs", "index.html")))
+
+        self.write(os.path.join("static", "images", "tom.png"), png_header(800, 300) + b"\0")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertIn('width="800" height="300"', self.read(os.path.join("docs", "index.html")))
+
+    def test_static_change_is_minified(self):
+        watcher = self.start("--minify")
+
+        self.write(os.path.join("static", "index.css"), "body {\n    color: blue;\n}\n")
+
+        self.assertTrue(self.poll(watcher))
+        self.assertEqual(self.read(os.path.join("docs", "index.css")), "body{color:blue}")
+
+    def test_rebuilt_pages_are_compressed(self):
+        page = os.path.join("docs", "contact", "index.html")
+        watcher = self.start("--compress", "--compress-min-size", "0")
+        self.assertTrue(os.path.isfile(page + ".gz"))
+
+        self.write(os.path.join("content", "contact", "index.md"), "# Contact us")
+
+        self.assertTrue(self.poll(watcher))
+        with gzip.open(page + ".gz", "rt") as file:
+            self.assertEqual(file.read(), self.read(page))
+        self.assertIn("Contact us", self.read(page))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import unittest
+
+from siteindex import text_terms, page_url, write_sitemap, write_feed, write_search_index
+from fixtures import TempDirTestCase
+
+
+class Test_text_terms(unittest.TestCase):
+    def test_lowercases_and_dedupes(self):
+        self.assertSetEqual(text_terms("Tom Bombadil, tom and a Hobbit!"), { "tom", "bombadil", "and", "hobbit" })
+
+
+class Test_page_url(unittest.TestCase):
+    def test_index_pages(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs", "/base/"), "/base/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "about.html"), "docs"), "/about.html")
+
+
+class Test_writers(TempDirTestCase):
+    def test_sitemap(self):
+        path = os.path.join(self.root, "sitemap.xml")
+
+        self.assertTrue(write_sitemap(path, ["https://example.com/", "https://example.com/?a=1&b=2"]))
+        self.assertIn("<loc>https://example.com/?a=1&amp;b=2</loc>", self.read(path))
+        self.assertFalse(write_sitemap(path, ["https://example.com/", "https://example.com/?a=1&b=2"]))
+
+    def test_feed(self):
+        path = os.path.join(self.root, "feed.xml")
+
+        write_feed(path, "Tolkien Fan Club", "https://example.com/", [("Tom & Goldberry", "https://example.com/blog/tom/")])
+
+        self.assertIn("<item><title>Tom &amp; Goldberry</title><link>https://example.com/blog/tom/</link>", self.read(path))
+
+    def test_search_index(self):
+        path = os.path.join(self.root, "search.json")
+
+        write_search_index(path, [
+            ("/", "Home", ["hobbit", "tolkien"]),
+            ("/blog/tom/", "Tom", ["hobbit", "tom"]),
+        ])
+
+        self.assertDictEqual(json.loads(self.read(path)), {
+            "pages": [["/", "Home"], ["/blog/tom/", "Tom"]],
+            "terms": { "hobbit": [0, 1], "tolkien": [0], "tom": [1] },
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
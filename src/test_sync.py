@@ -0,0 +1,78 @@
+import os
+import unittest
+
+from manifest import BuildManifest
+from sync import sync_directory
+from fixtures import TempDirTestCase
+
+
+class Test_sync_directory(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "tom.png"), "png bytes")
+
+    def test_first_sync_copies_everything(self):
+        report = sync_directory(self.static, self.public, self.manifest)
+
+        self.assertEqual(len(report.copied), 2)
+        self.assertEqual(report.bytes_copied, 16)
+        self.assertEqual(self.read(os.path.join(self.public, "images", "tom.png")), "png bytes")
+
+    def test_second_sync_skips_unchanged(self):
+        sync_directory(self.static, self.public, self.manifest)
+        report = sync_directory(self.static, self.public, self.manifest)
+
+        self.assertEqual(len(report.copied), 0)
+        self.assertEqual(len(report.skipped), 2)
+        self.assertEqual(report.bytes_skipped, 16)
+
+    def test_changed_file_is_copied(self):
+        sync_directory(self.static, self.public, self.manifest)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+
+        report = sync_directory(self.static, self.public, self.manifest)
+
+        self.assertListEqual(report.copied, [os.path.join(self.public, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_stale_file_is_removed(self):
+        self.write(os.path.join(self.public, "index.html"), "<html></html>")
+        sync_directory(self.static, self.public, self.manifest)
+        os.remove(os.path.join(self.static, "images", "tom.png"))
+
+        report = sync_directory(self.static, self.public, self.manifest)
+
+        self.assertListEqual(report.removed, [os.path.join(self.public, "images", "tom.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_link(self):
+        report = sync_directory(self.static, self.public, self.manifest, link=True)
+
+        self.assertEqual(len(report.linked), 2)
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.static, "index.css"),
+            os.path.join(self.public, "index.css")
+        ))
+
+
+    def test_rename(self):
+        rename = lambda from_path, dest_path: dest_path.replace(".", ".v1.")
+
+        sync_directory(self.static, self.public, self.manifest, rename=rename)
+        report = sync_directory(self.static, self.public, self.manifest, rename=lambda _, dest_path: dest_path)
+
+        self.assertListEqual(sorted(report.removed), [
+            os.path.join(self.public, "images", "tom.v1.png"),
+            os.path.join(self.public, "index.v1.css"),
+        ])
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
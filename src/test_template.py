@@ -0,0 +1,63 @@
+import io
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template
+import fingerprint
+from minify import MinifyCache
+
+
+class Test_Template(unittest.TestCase):
+    def test_parse(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+        self.assertListEqual(template.segments, ["<title>", "</title><article>", "</article>"])
+        self.assertListEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        content = ParentNode("p", [LeafNode("b", "bold")])
+
+        actual = template.render({ "Title": "Home", "Content": content })
+
+        self.assertEqual(actual, "<title>Home</title><p><b>bold</b></p>")
+
+    def test_minified(self):
+        with tempfile.TemporaryDirectory() as directory:
+            template = Template("<html>\n  <title>{{ Title }}</title>\n  <pre>{{ Content }}</pre>\n</html>\n", "/", MinifyCache(directory))
+
+        self.assertListEqual(template.segments, ["<html><title>", "</title><pre>", "</pre></html>"])
+        self.assertEqual(template.saved, 8)
+
+    def test_write_matches_render(self):
+        template = Template("{{ Content }}<h1>{{ Title }}</h1>{{ Content }}")
+        values = { "Title": "Home", "Content": ParentNode("p", [LeafNode(None, "text")]) }
+        stream = io.StringIO()
+
+        template.write(stream, values)
+
+        self.assertEqual(stream.getvalue(), template.render(values))
+
+    def test_basepath_applied_to_literals(self):
+        template = Template('<link href="/index.css" /><img src="/logo.png" />{{ Content }}', "/blog/")
+
+        actual = template.render({ "Content": 'href="/untouched"' })
+
+        self.assertEqual(actual, '<link href="/blog/index.css" /><img src="/blog/logo.png" />href="/untouched"')
+
+    def test_fingerprinted_literals(self):
+        fingerprint.enable({ "/index.css": "/index.3f9a1c2b.css" })
+        self.addCleanup(fingerprint.enable, None)
+
+        template = Template('<link href="/index.css" /><img src="/logo.png" />', "/blog/")
+
+        self.assertEqual(template.render({}), '<link href="/blog/index.3f9a1c2b.css" /><img src="/blog/logo.png" />')
+
+    def test_missing_value_kept_literal(self):
+        template = Template("<title>{{ Title }}</title>")
+        self.assertEqual(template.render({}), "<title>{{ Title }}</title>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,11 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a text node", TextType.ITALIC)
         node2 = "italic"
         self.assertNotEqual(node, node2)
+
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "color", "red")
     
 
 if __name__ == "__main__":
@@ -12,6 +12,8 @@ class TextType(Enum):
 
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     text: str
     text_type: TextType
     url: Optional[str]